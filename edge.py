@@ -7,6 +7,8 @@ class Edge:
         tau (float): Euclidean travel time between u and v.
         D_ij (float): Spatio-temporal distance (weight) for this edge.
     """
+    __slots__ = ("u_id", "v_id", "tau", "D_ij")
+
     def __init__(self, u_id, v_id, tau):
         self.u_id = u_id
         self.v_id = v_id
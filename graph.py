@@ -20,6 +20,7 @@ class Graph:
         self.nodes = {}
         self.edges = []
         self.adj = {} # Adjacency list: {node_id: {neighbor_id, ...}}
+        self._edge_index = {} # {frozenset({u_id, v_id}): Edge}, O(1) lookup of undirected edges
 
     def add_node(self, node):
         """Adds a node to the graph."""
@@ -33,13 +34,13 @@ class Graph:
             raise ValueError(f"Nodes {u_id} or {v_id} not found in graph.")
         
         # Check if edge already exists to avoid duplicates
-        for edge in self.edges:
-            if (edge.u_id == u_id and edge.v_id == v_id) or \
-               (edge.u_id == v_id and edge.v_id == u_id):
-                return # Edge already exists
+        key = frozenset((u_id, v_id))
+        if key in self._edge_index:
+            return # Edge already exists
 
         edge = Edge(u_id, v_id, tau)
         self.edges.append(edge)
+        self._edge_index[key] = edge
         self.adj[u_id].add(v_id)
         self.adj[v_id].add(u_id) # Assuming undirected graph for VRP connections
 
@@ -50,6 +51,8 @@ class Graph:
 
         # Remove edges connected to this node
         self.edges = [edge for edge in self.edges if edge.u_id != node_id and edge.v_id != node_id]
+        for neighbor_id in self.adj.get(node_id, ()):
+            self._edge_index.pop(frozenset((node_id, neighbor_id)), None)
 
         # Remove from adjacency list
         if node_id in self.adj:
@@ -62,11 +65,7 @@ class Graph:
 
     def get_edge_by_nodes(self, u_id, v_id):
         """Returns an edge object given its two node IDs, or None if not found."""
-        for edge in self.edges:
-            if (edge.u_id == u_id and edge.v_id == v_id) or \
-               (edge.u_id == v_id and edge.v_id == u_id):
-                return edge
-        return None
+        return self._edge_index.get(frozenset((u_id, v_id)))
 
     def get_neighbors(self, node_id):
         """Returns a set of neighbor IDs for a given node."""
@@ -14,6 +14,14 @@ class GreedySolver:
         self.depot_id = depot_id
         self.vehicle_capacity = vehicle_capacity
 
+        # Pairwise travel times, computed once: every candidate check re-walks the
+        # current route, so the same legs would otherwise be recomputed each time
+        nodes = graph.nodes
+        self._tau = {
+            id_a: {id_b: compute_euclidean_tau(node_a, node_b) for id_b, node_b in nodes.items()}
+            for id_a, node_a in nodes.items()
+        }
+
     def solve(self) -> tuple[list, dict]:
         """
         Generates routes on the given graph using a simple greedy heuristic.
@@ -48,12 +56,8 @@ class GreedySolver:
                 best_next_node_id = None
                 min_travel_time = float('inf')
                 
-                current_node = self.graph.nodes[current_node_id]
-
                 feasible_candidates = []
                 for candidate_node_id in unvisited_customers:
-                    candidate_node = self.graph.nodes[candidate_node_id]
-                    
                     # --- Robust Feasibility Check for Candidate Insertion ---
                     # Temporarily add candidate to route to check full route feasibility
                     temp_route_segment = current_route[1:] + [candidate_node_id]
@@ -65,7 +69,7 @@ class GreedySolver:
                     if not is_feasible_with_candidate:
                         continue
 
-                    travel_time_to_candidate = compute_euclidean_tau(current_node, candidate_node)
+                    travel_time_to_candidate = self._tau[current_node_id][candidate_node_id]
                     
                     if travel_time_to_candidate < min_travel_time:
                         min_travel_time = travel_time_to_candidate
@@ -74,7 +78,7 @@ class GreedySolver:
                 if best_next_node_id:
                     next_node = self.graph.nodes[best_next_node_id]
                     
-                    travel_time_to_next = compute_euclidean_tau(current_node, next_node)
+                    travel_time_to_next = self._tau[current_node_id][best_next_node_id]
                     arrival_time_at_next = current_time + travel_time_to_next
                     service_start_time_at_next = max(arrival_time_at_next, next_node.e)
                     
@@ -92,8 +96,7 @@ class GreedySolver:
             
             if current_node_id != self.depot_id:
                 depot_node = self.graph.nodes[self.depot_id]
-                current_node = self.graph.nodes[current_node_id]
-                travel_time_to_depot = compute_euclidean_tau(current_node, depot_node)
+                travel_time_to_depot = self._tau[current_node_id][self.depot_id]
                 arrival_time_at_depot = current_time + travel_time_to_depot
                 
                 if arrival_time_at_depot <= depot_node.l:
@@ -137,6 +140,6 @@ class GreedySolver:
         if not temp_route_for_metrics or (len(temp_route_for_metrics) == 2 and temp_route_for_metrics[0] == self.depot_id and temp_route_for_metrics[1] == self.depot_id):
             return 0.0, True
 
-        metrics = calculate_route_metrics(self.graph, [temp_route_for_metrics], self.depot_id, vehicle_capacity)
+        metrics = calculate_route_metrics(self.graph, [temp_route_for_metrics], self.depot_id, vehicle_capacity, tau_table=self._tau)
         return metrics["total_distance"], metrics["is_feasible"]
 
@@ -5,7 +5,9 @@ import time
 import argparse
 from pathlib import Path
 
-from .graph import Graph, compute_euclidean_tau
+import numpy as np
+
+from .graph import Graph
 from .utils import load_graph_from_csv, calculate_route_metrics
 from .coarsener import SpatioTemporalGraphCoarsener
 from .quantum_solvers.vrp_problem import VRPProblem
@@ -28,11 +30,15 @@ def convert_graph_to_vrp_problem_inputs(graph: Graph, depot_id: str, vehicle_cap
     int_to_id_map = [depot_id] + customer_ids
     id_to_int_map = {nid: i for i, nid in enumerate(int_to_id_map)}
     
-    num_nodes = len(int_to_id_map)
     int_depot_id = id_to_int_map[depot_id]
 
-    costs = [[0.0] * num_nodes for _ in range(num_nodes)]
-    time_costs = [[0.0] * num_nodes for _ in range(num_nodes)]
+    # All pairwise Euclidean distances at once, rows/columns in integer-id order
+    coords = np.array([(graph.nodes[nid].x, graph.nodes[nid].y) for nid in int_to_id_map], dtype=np.float64)
+    deltas = coords[:, None, :] - coords[None, :, :]
+    distances = np.sqrt((deltas ** 2).sum(axis=-1))
+    costs = distances.tolist()
+    time_costs = distances.tolist()
+
     demands = {}
     time_windows = {}
     service_times = {}
@@ -42,11 +48,6 @@ def convert_graph_to_vrp_problem_inputs(graph: Graph, depot_id: str, vehicle_cap
         demands[u_int] = u_node.demand
         time_windows[u_int] = (u_node.e, u_node.l)
         service_times[u_int] = u_node.s
-        for v_id, v_node in graph.nodes.items():
-            v_int = id_to_int_map[v_id]
-            tau = 0.0 if u_id == v_id else compute_euclidean_tau(u_node, v_node)
-            costs[u_int][v_int] = tau
-            time_costs[u_int][v_int] = tau
 
     
     # Use fewer vehicles to encourage multi-customer routes
@@ -15,6 +15,10 @@ class Node:
         is_super_node (bool): True if this node is a merged super-node.
         original_nodes (list): List of original node IDs that form this super-node.
     """
+    # Fixed attribute set: no per-instance __dict__, so attribute reads are
+    # slot lookups and every node is smaller
+    __slots__ = ("id", "x", "y", "s", "e", "l", "demand", "t", "is_super_node", "original_nodes")
+
     def __init__(self, id, x, y, s, e, l, demand, is_super_node=False, original_nodes=None):
         self.id = id
         self.x = x
@@ -1,16 +1,22 @@
 import os
 import logging
-import random
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # Plots are only written to disk; avoid GUI backends
 import matplotlib.pyplot as plt
 import seaborn as sns
-from collections import defaultdict
 from pathlib import Path
 import pandas as pd
 import json
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
 # Import necessary classes and functions from your project
 from graph_coarsening.graph import Graph
-from graph_coarsening.utils import load_graph_from_csv, calculate_route_metrics
+from graph_coarsening.utils import load_graph_from_csv, calculate_route_metrics, log_tuning_summary, run_tuning_trials
 from graph_coarsening.coarsener import SpatioTemporalGraphCoarsener
 from graph_coarsening.greedy_solver import GreedySolver
 from graph_coarsening.savings_solver import SavingsSolver
@@ -20,6 +26,9 @@ from graph_coarsening.savings_solver import SavingsSolver
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+# Dense scatter/box plots rasterise faster with maximal path simplification
+plt.rcParams['path.simplify_threshold'] = 1.0
+
 
 def run_evaluation_classical(
     initial_graph: Graph,
@@ -29,23 +38,34 @@ def run_evaluation_classical(
     beta: float,
     P: float,
     radiusCoeff: float,
-    solver_name: str
+    solver_name: str,
+    coarsener_cache: dict = None
 ) -> tuple[float, dict]:
     """
     Runs the full coarsening and solving pipeline for a classical solver
     and returns an objective score and the resulting metrics.
+
+    If ``coarsener_cache`` is given, the coarsened graph and its coarsener are
+    stored in it keyed by ``(alpha, beta, P, radiusCoeff)`` so that repeated
+    parameter combinations on the same graph only coarsen once.
     """
     try:
-        # 1. Coarsen the graph with the given parameters
-        coarsener = SpatioTemporalGraphCoarsener(
-            graph=initial_graph,
-            alpha=alpha,
-            beta=beta,
-            P=P,
-            radiusCoeff=radiusCoeff,
-            depot_id=depot_id
-        )
-        coarsened_graph, _ = coarsener.coarsen()
+        # 1. Coarsen the graph with the given parameters (reusing a cached result if possible)
+        key = (alpha, beta, P, radiusCoeff)
+        if coarsener_cache is not None and key in coarsener_cache:
+            coarsened_graph, coarsener = coarsener_cache[key]
+        else:
+            coarsener = SpatioTemporalGraphCoarsener(
+                graph=initial_graph,
+                alpha=alpha,
+                beta=beta,
+                P=P,
+                radiusCoeff=radiusCoeff,
+                depot_id=depot_id
+            )
+            coarsened_graph, _ = coarsener.coarsen()
+            if coarsener_cache is not None:
+                coarsener_cache[key] = (coarsened_graph, coarsener)
 
         # 2. Run the specified classical solver on the coarsened graph
         solver = None
@@ -81,79 +101,81 @@ def run_evaluation_classical(
         return float('inf'), {}
 
 
-def create_boxplots(results_for_plots: list, file_name_only: str, param_name: str):
+def save_results_json(rows: list, file_path: str):
+    """
+    Writes the flat list of trial results to a JSON file.
+
+    Without orjson the file is written by json.dump with indent=4, as before.
+    orjson is used when available because it is considerably faster for large
+    result lists; its output is indented by 2 and writes the infinite score
+    of a failed trial as null instead of Infinity.
+    """
+    if orjson is not None:
+        with open(file_path, "wb") as f:
+            f.write(orjson.dumps(rows, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(file_path, "w") as f:
+            json.dump(rows, f, indent=4)
+
+
+def create_boxplots(trials_df: pd.DataFrame, file_name_only: str, param_name: str):
     """
     Creates boxplots from the tuning results for a single parameter.
     
     Args:
-        results_for_plots (list): A list of dictionaries, where each dictionary
-                                  represents a single run and contains 'value' and 'score'.
+        trials_df (pd.DataFrame): One row per trial, with a column for each
+                                  tuned parameter and a 'score' column.
         file_name_only (str): The base name of the file to save the plot.
-        param_name (str): The name of the parameter being plotted.
+        param_name (str): The name of the parameter (column) being plotted.
     """
-    if not results_for_plots:
-        logger.warning(f"No data to plot for {param_name} on {file_name_only}. Skipping boxplot creation.")
-        return
-
-    # Convert the list of results to a pandas DataFrame
-    plot_data = pd.DataFrame(results_for_plots)
-
-    if plot_data.empty:
+    if trials_df is None or trials_df.empty:
         logger.warning(f"DataFrame is empty for {param_name} on {file_name_only}. Skipping boxplot creation.")
         return
 
     # Ensure the required columns exist
-    if 'value' not in plot_data.columns or 'score' not in plot_data.columns:
-        logger.error(f"Required columns 'value' or 'score' not found in data for {param_name}.")
+    if param_name not in trials_df.columns or 'score' not in trials_df.columns:
+        logger.error(f"Required columns '{param_name}' or 'score' not found in data for {param_name}.")
         return
 
     plt.figure(figsize=(12, 8))
-    ax = sns.boxplot(x='value', y='score', data=plot_data, palette='coolwarm')
+    ax = sns.boxplot(x=param_name, y='score', data=trials_df, palette='coolwarm')
     ax.set_title(f'Performance Scores for {param_name} on {file_name_only}')
     ax.set_xlabel(f'{param_name.title()} Value')
     ax.set_ylabel('Score')
     ax.tick_params(axis='x', rotation=45)
     plt.tight_layout()
     plot_path = os.path.join("plots", f"{os.path.splitext(file_name_only)[0]}_{param_name}_boxplot.png")
-    os.makedirs(os.path.dirname(plot_path), exist_ok=True)
     plt.savefig(plot_path)
     logger.info(f"Boxplot saved to {plot_path}")
     plt.close()
 
 
-def create_scatterplots(results_for_plots: list, file_name_only: str, param_name: str):
+def create_scatterplots(trials_df: pd.DataFrame, file_name_only: str, param_name: str):
     """
     Creates scatterplots from the tuning results for a single parameter.
     
     Args:
-        results_for_plots (list): A list of dictionaries, where each dictionary
-                                  represents a single run and contains 'value' and 'score'.
+        trials_df (pd.DataFrame): One row per trial, with a column for each
+                                  tuned parameter and a 'score' column.
         file_name_only (str): The base name of the file to save the plot.
-        param_name (str): The name of the parameter being plotted.
+        param_name (str): The name of the parameter (column) being plotted.
     """
-    if not results_for_plots:
-        logger.warning(f"No data to plot for {param_name} on {file_name_only}. Skipping scatterplot creation.")
-        return
-
-    plot_data = pd.DataFrame(results_for_plots)
-    
-    if plot_data.empty:
+    if trials_df is None or trials_df.empty:
         logger.warning(f"DataFrame is empty for {param_name} on {file_name_only}. Skipping scatterplot creation.")
         return
 
-    if 'value' not in plot_data.columns or 'score' not in plot_data.columns:
-        logger.error(f"Required columns 'value' or 'score' not found in data for {param_name}.")
+    if param_name not in trials_df.columns or 'score' not in trials_df.columns:
+        logger.error(f"Required columns '{param_name}' or 'score' not found in data for {param_name}.")
         return
 
     plt.figure(figsize=(12, 8))
-    ax = sns.scatterplot(x='value', y='score', data=plot_data, hue='score', palette='viridis', legend=False)
+    ax = sns.scatterplot(x=param_name, y='score', data=trials_df, hue='score', palette='viridis', legend=False)
     ax.set_title(f'Performance Scores for {param_name} on {file_name_only}')
     ax.set_xlabel(f'{param_name.title()} Value')
     ax.set_ylabel('Score')
     ax.tick_params(axis='x', rotation=45)
     plt.tight_layout()
     plot_path = os.path.join("plots", f"{os.path.splitext(file_name_only)[0]}_{param_name}_scatterplot.png")
-    os.makedirs(os.path.dirname(plot_path), exist_ok=True)
     plt.savefig(plot_path)
     logger.info(f"Scatterplot saved to {plot_path}")
     plt.close()
@@ -182,6 +204,13 @@ if __name__ == "__main__":
 
     # Random Search parameters for overall tuning
     num_random_trials_per_file = 20 # Number of random combinations to try
+    random_seed = None # Set to an int for reproducible runs
+    max_workers = os.cpu_count() # Worker processes evaluating trials in parallel
+
+    rng = np.random.default_rng(random_seed)
+
+    # Plot output directory, created once rather than per plot
+    Path("plots").mkdir(parents=True, exist_ok=True)
 
     best_params_per_file = {}
 
@@ -199,37 +228,35 @@ if __name__ == "__main__":
         best_params_for_file = None
         best_metrics_for_file = None
 
-        # Dictionary to store all trial results for plotting
-        results_for_plots = {
-            'alpha': defaultdict(list),
-            'beta': defaultdict(list),
-            'P': defaultdict(list),
-            'radiusCoeff': defaultdict(list),
-            'solver_type': defaultdict(list)
-        }
-        flat_results = []
+        # One row per trial; also the source for this file's plots
+        file_rows = []
         # --- Random Search for Coarsening Parameters + Solver Type ---
-        for _ in range(num_random_trials_per_file):
-            alpha = random.choice(alpha_values)
-            beta = random.choice(beta_values)
-            P = random.choice(P_values)
-            radiusCoeff = random.choice(radiusCoeff_values)
-            solver_type = random.choice(classical_solvers)
-
-            score, metrics = run_evaluation_classical(
-                initial_graph, depot_id, VEHICLE_CAPACITY,
-                alpha, beta, P, radiusCoeff,
-                solver_name=solver_type
-            )
-            
-            # Store results for boxplot/scatterplot generation
-            results_for_plots['alpha'][alpha].append(score)
-            results_for_plots['beta'][beta].append(score)
-            results_for_plots['P'][P].append(score)
-            results_for_plots['radiusCoeff'][radiusCoeff].append(score)
-            results_for_plots['solver_type'][solver_type].append(score)
-
-            # --- Add one row into flat_results for JSON ---
+        # Draw every trial's parameters for this file up front
+        alphas = rng.choice(alpha_values, size=num_random_trials_per_file).tolist()
+        betas = rng.choice(beta_values, size=num_random_trials_per_file).tolist()
+        Ps = rng.choice(P_values, size=num_random_trials_per_file).tolist()
+        radii = rng.choice(radiusCoeff_values, size=num_random_trials_per_file).tolist()
+        solver_types = rng.choice(classical_solvers, size=num_random_trials_per_file).tolist()
+
+        # The parsed graph goes to each worker once; workers keep a coarsening cache for this file
+        trial_results = run_tuning_trials(
+            run_evaluation_classical,
+            (initial_graph, depot_id, VEHICLE_CAPACITY),
+            [(alphas[i], betas[i], Ps[i], radii[i], solver_types[i]) for i in range(num_random_trials_per_file)],
+            failed_result=(float('inf'), {}),
+            max_workers=max_workers
+        )
+
+        # Record trials in draw order so results do not depend on worker scheduling
+        for i in range(num_random_trials_per_file):
+            alpha = alphas[i]
+            beta = betas[i]
+            P = Ps[i]
+            radiusCoeff = radii[i]
+            solver_type = solver_types[i]
+            score, metrics = trial_results[i]
+
+            # --- Add one row into flat_results for JSON and plotting ---
             row = {
                 "file": file_name_only,
                 "alpha": alpha,
@@ -248,6 +275,7 @@ if __name__ == "__main__":
                     "time_window_violations": metrics.get("time_window_violations"),
                     "is_feasible": metrics.get("is_feasible")
                 })
+            file_rows.append(row)
             all_flat_results.append(row)
 
             if score < best_score_for_file:
@@ -264,35 +292,14 @@ if __name__ == "__main__":
 
 
         combined_json_path = "results.json"  # aligns with your plotting script
-        with open(combined_json_path, "w") as f:
-            json.dump(all_flat_results, f, indent=4)
+        save_results_json(all_flat_results, combined_json_path)
         logger.info(f"Combined results from all datasets saved to: {combined_json_path}")
                 
-        # Generate boxplots for the current file for each parameter
-        """for param_name, param_results in results_for_plots.items():
-            if param_results:
-                plot_data = []
-                for value, scores in param_results.items():
-                    for score in scores:
-                        plot_data.append({'value': value, 'score': score})
-                create_boxplots(plot_data, file_name_only, param_name)
-                # You can also generate scatterplots if desired by uncommenting the line below
-                create_scatterplots(plot_data, file_name_only, param_name)"""
-
-
-    logger.info("\n\n=====================================================================================")
-    logger.info("======================== FINAL SUMMARY OF CLASSICAL TUNING RESULTS =============================")
-    logger.info("=====================================================================================")
-
-    for file_name, result in best_params_per_file.items():
-        logger.info(f"File: {file_name}")
-        logger.info(f"  Best Coarsening Params: {result['params']}")
-        logger.info(f"  Best Objective Score: {result['score']:.2f}")
-        if result['metrics']:
-            logger.info(f"  Resulting Metrics (on Original Graph after Inflation):")
-            for key, value in result['metrics'].items():
-                if isinstance(value, float):
-                    logger.info(f"    {key.replace('_', ' ').title()}: {value:.2f}")
-                else:
-                    logger.info(f"    {key.replace('_', ' ').title()}: {value}")
-        logger.info("-" * 80)
+        # Generate box and scatter plots for the current file for each parameter
+        trials_df = pd.DataFrame(file_rows)
+        for param_name in ('alpha', 'beta', 'P', 'radiusCoeff', 'solver_type'):
+            create_boxplots(trials_df, file_name_only, param_name)
+            create_scatterplots(trials_df, file_name_only, param_name)
+
+
+    log_tuning_summary(best_params_per_file, logger, "FINAL SUMMARY OF CLASSICAL TUNING RESULTS")
@@ -1,15 +1,17 @@
 import os
 import logging
-import random
 import json
 import time
 import sys
 import argparse
+import matplotlib
+matplotlib.use("Agg")  # Plots are only written to disk; avoid GUI backends
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
-from collections import defaultdict
+import numpy as np
 from pathlib import Path
+from scipy.stats import qmc
 
 # --- Path Setup to allow standalone execution ---
 current_file = Path(__file__).resolve()
@@ -18,8 +20,8 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 # --- Imports from the Project ---
-from graph_coarsening.graph import Graph, compute_euclidean_tau
-from graph_coarsening.utils import load_graph_from_csv, calculate_route_metrics
+from graph_coarsening.graph import Graph
+from graph_coarsening.utils import load_graph_from_csv, calculate_route_metrics, log_tuning_summary, run_tuning_trials
 from graph_coarsening.coarsener import SpatioTemporalGraphCoarsener
 from graph_coarsening.quantum_solvers.vrp_problem import VRPProblem
 from graph_coarsening.quantum_solvers.vrp_solvers import FullQuboSolver, AveragePartitionSolver, IterativeRepairSolver
@@ -29,6 +31,9 @@ from graph_coarsening.visualisation import visualize_routes
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+# Dense scatter/box plots rasterise faster with maximal path simplification
+plt.rcParams['path.simplify_threshold'] = 1.0
+
 # --- Constants & Directories ---
 RESULTS_DIR = "tuning_results_quantum_v2"
 PLOTS_DIR = os.path.join(RESULTS_DIR, "tuning_plots")
@@ -69,11 +74,15 @@ def convert_graph_to_vrp_problem_inputs(graph: Graph, depot_id: str, vehicle_cap
     int_to_id_map = [depot_id] + customer_ids
     id_to_int_map = {nid: i for i, nid in enumerate(int_to_id_map)}
     
-    num_nodes = len(int_to_id_map)
     int_depot_id = id_to_int_map[depot_id]
 
-    costs = [[0.0] * num_nodes for _ in range(num_nodes)]
-    time_costs = [[0.0] * num_nodes for _ in range(num_nodes)]
+    # All pairwise Euclidean distances at once, rows/columns in integer-id order
+    coords = np.array([(graph.nodes[nid].x, graph.nodes[nid].y) for nid in int_to_id_map], dtype=np.float64)
+    deltas = coords[:, None, :] - coords[None, :, :]
+    distances = np.sqrt((deltas ** 2).sum(axis=-1))
+    costs = distances.tolist()
+    time_costs = distances.tolist()
+
     demands = {}
     time_windows = {}
     service_times = {}
@@ -83,11 +92,6 @@ def convert_graph_to_vrp_problem_inputs(graph: Graph, depot_id: str, vehicle_cap
         demands[u_int] = u_node.demand
         time_windows[u_int] = (u_node.e, u_node.l)
         service_times[u_int] = u_node.s
-        for v_id, v_node in graph.nodes.items():
-            v_int = id_to_int_map[v_id]
-            tau = 0.0 if u_id == v_id else compute_euclidean_tau(u_node, v_node)
-            costs[u_int][v_int] = tau
-            time_costs[u_int][v_int] = tau
 
     # --- IMPROVEMENT: Optimized Vehicle Count ---
     num_customers = len(customer_ids)
@@ -119,26 +123,37 @@ def run_evaluation_quantum(
     beta: float,
     P: float,
     radiusCoeff: float,
-    solver_name: str
+    solver_name: str,
+    problem_cache: dict = None
 ) -> tuple[float, dict, list]:
     """
     Runs coarsening -> solving -> inflating.
     Returns: (Objective Score, Metrics Dict, Routes)
+
+    If ``problem_cache`` is given, the coarsener and the VRP problem built from
+    its coarsened graph are stored in it keyed by ``(alpha, beta, P, radiusCoeff)``,
+    so trials repeating a coarsening combination skip straight to solving.
     """
     try:
-        # 1. Coarsen the graph
-        coarsener = SpatioTemporalGraphCoarsener(
-            graph=subgraph,
-            alpha=alpha,
-            beta=beta,
-            P=P,
-            radiusCoeff=radiusCoeff,
-            depot_id=depot_id
-        )
-        coarsened_graph, _ = coarsener.coarsen()
+        key = (alpha, beta, P, radiusCoeff)
+        if problem_cache is not None and key in problem_cache:
+            coarsener, vrp, int_to_id_map = problem_cache[key]
+        else:
+            # 1. Coarsen the graph
+            coarsener = SpatioTemporalGraphCoarsener(
+                graph=subgraph,
+                alpha=alpha,
+                beta=beta,
+                P=P,
+                radiusCoeff=radiusCoeff,
+                depot_id=depot_id
+            )
+            coarsened_graph, _ = coarsener.coarsen()
 
-        # 2. Convert to VRP input
-        vrp, int_to_id_map = convert_graph_to_vrp_problem_inputs(coarsened_graph, depot_id, vehicle_capacity)
+            # 2. Convert to VRP input
+            vrp, int_to_id_map = convert_graph_to_vrp_problem_inputs(coarsened_graph, depot_id, vehicle_capacity)
+            if problem_cache is not None:
+                problem_cache[key] = (coarsener, vrp, int_to_id_map)
 
         # 3. Initialize Solver (Now includes IterativeRepairSolver)
         if solver_name == 'FullQuboSolver':
@@ -204,13 +219,35 @@ def run_evaluation_quantum(
 
 # --- Plotting Functions ---
 
-def create_boxplots(results_for_plots: list, file_name_only: str, param_name: str, num_customers: int):
-    if not results_for_plots: return
-    plot_data = pd.DataFrame(results_for_plots)
-    if plot_data.empty or 'value' not in plot_data.columns: return
+def sobol_grid_samples(grids: list, n: int, rng: np.random.Generator) -> list:
+    """
+    Draws ``n`` low-discrepancy points over the product of discrete grids.
+
+    The Sobol balance properties only hold when ``n`` is a power of two;
+    other sizes still cover the grid evenly, but scipy warns about them.
+
+    Args:
+        grids (list): One list of candidate values per parameter.
+        n (int): Number of samples to draw.
+        rng (np.random.Generator): Seeds the Sobol scrambling.
+
+    Returns:
+        list: One list of ``n`` sampled values per grid, in the order given.
+    """
+    sampler = qmc.Sobol(d=len(grids), scramble=True, seed=rng)
+    points = sampler.random(n)
+    samples = []
+    for k, grid in enumerate(grids):
+        idx = np.minimum((points[:, k] * len(grid)).astype(int), len(grid) - 1)
+        samples.append([grid[j] for j in idx])
+    return samples
+
+
+def create_boxplots(trials_df: pd.DataFrame, file_name_only: str, param_name: str, num_customers: int):
+    if trials_df is None or trials_df.empty or param_name not in trials_df.columns: return
 
     plt.figure(figsize=(12, 8))
-    ax = sns.boxplot(x='value', y='score', data=plot_data, palette='coolwarm')
+    ax = sns.boxplot(x=param_name, y='score', data=trials_df, palette='coolwarm')
     ax.set_title(f'Quantum Tuning: {param_name} on {file_name_only} (N={num_customers})')
     ax.set_xlabel(f'{param_name.title()} Value')
     ax.set_ylabel('Objective Score (Lower is Better)')
@@ -225,7 +262,9 @@ def main():
     parser = argparse.ArgumentParser(description="Tune Quantum Solvers with Graph Coarsening.")
     parser.add_argument("--data", type=str, default=None, help="Directory containing Solomon CSV files.")
     parser.add_argument("--customers", type=int, default=10, help="Number of customers to subsample.")
-    parser.add_argument("--trials", type=int, default=20, help="Number of random trials per file.")
+    parser.add_argument("--trials", type=int, default=16, help="Number of Sobol trials per file. Use a power of two; other counts leave the Sobol sample unbalanced.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the parameter sampler (default: random).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes evaluating trials in parallel.")
     args = parser.parse_args()
 
     # Determine Dataset Directory
@@ -249,6 +288,7 @@ def main():
     quantum_solvers = ['FullQuboSolver', 'AveragePartitionSolver', 'IterativeRepairSolver']
 
     best_params_per_file = {}
+    rng = np.random.default_rng(args.seed)
 
     for csv_file_path in all_csv_file_paths:
         file_name_only = os.path.basename(csv_file_path)
@@ -264,39 +304,39 @@ def main():
         best_score_for_file = float('inf')
         best_result_packet = None
 
-        results_for_plots = {
-            'alpha': defaultdict(list),
-            'beta': defaultdict(list),
-            'P': defaultdict(list),
-            'radiusCoeff': defaultdict(list),
-            'solver_type': defaultdict(list)
-        }
+        file_rows = []
 
         # Random Search Loop
+        # Sample all trial parameters for this file in one go. The coarsening
+        # parameters come from a scrambled Sobol sequence mapped onto the grids,
+        # which covers the 4-D grid far more evenly than independent draws.
+        alphas, betas, Ps, radii = sobol_grid_samples(
+            [alpha_values, beta_values, P_values, radiusCoeff_values], args.trials, rng
+        )
+        solver_types = rng.choice(quantum_solvers, size=args.trials).tolist()
+
+        # The subgraph goes to each worker once; workers keep a problem cache for this file
+        trial_results = run_tuning_trials(
+            run_evaluation_quantum,
+            (initial_graph, depot_id, VEHICLE_CAPACITY),
+            [(alphas[i], betas[i], Ps[i], radii[i], solver_types[i]) for i in range(args.trials)],
+            failed_result=(float('inf'), {}, []),
+            max_workers=args.workers
+        )
+
+        # Record trials in draw order so results do not depend on worker scheduling
         for i in range(args.trials):
-            # Sample parameters
-            alpha = random.choice(alpha_values)
-            beta = random.choice(beta_values)
-            P = random.choice(P_values)
-            radiusCoeff = random.choice(radiusCoeff_values)
-            solver_type = random.choice(quantum_solvers)
+            alpha = alphas[i]
+            beta = betas[i]
+            P = Ps[i]
+            radiusCoeff = radii[i]
+            solver_type = solver_types[i]
 
             logger.debug(f"Trial {i+1}/{args.trials}: {solver_type} a={alpha}, b={beta}")
 
-            score, metrics, routes = run_evaluation_quantum(
-                initial_graph, depot_id, VEHICLE_CAPACITY,
-                alpha, beta, P, radiusCoeff,
-                solver_name=solver_type
-            )
-            
-            # Record Data for Plots
-            results_for_plots['alpha'][alpha].append(score)
-            results_for_plots['beta'][beta].append(score)
-            results_for_plots['P'][P].append(score)
-            results_for_plots['radiusCoeff'][radiusCoeff].append(score)
-            results_for_plots['solver_type'][solver_type].append(score)
-
-            # Record Data for JSON
+            score, metrics, routes = trial_results[i]
+
+            # Record Data for JSON and Plots
             row = {
                 "file": file_name_only,
                 "trial": i,
@@ -310,6 +350,7 @@ def main():
                     "is_feasible": metrics.get("is_feasible"),
                     "route_duration": metrics.get("total_route_duration")
                 })
+            file_rows.append(row)
             all_flat_results.append(row)
 
             # Track Best
@@ -345,26 +386,15 @@ def main():
             # )
 
         # 3. Generate Boxplots (These will still generate)
-        for param_name, param_results in results_for_plots.items():
-            if param_results:
-                plot_data = []
-                for value, scores in param_results.items():
-                    for s in scores:
-                        plot_data.append({'value': value, 'score': s})
-                create_boxplots(plot_data, file_name_only, param_name, args.customers)
+        trials_df = pd.DataFrame(file_rows)
+        for param_name in ('alpha', 'beta', 'P', 'radiusCoeff', 'solver_type'):
+            create_boxplots(trials_df, file_name_only, param_name, args.customers)
 
     # --- Final Summary ---
-    logger.info("\n" + "="*60)
-    logger.info("FINAL SUMMARY OF QUANTUM TUNING RESULTS")
-    logger.info("="*60)
-    for file_name, result in best_params_per_file.items():
-        logger.info(f"File: {file_name}")
-        logger.info(f"  Best Params: {result['params']}")
-        logger.info(f"  Best Score: {result['score']:.2f}")
-        if result['metrics']:
-            m = result['metrics']
-            logger.info(f"  Metrics: Feasible={m.get('is_feasible')}, Dist={m.get('total_distance'):.2f}, Vehicles={m.get('num_vehicles')}")
-        logger.info("-" * 40)
+    log_tuning_summary(
+        best_params_per_file, logger, "FINAL SUMMARY OF QUANTUM TUNING RESULTS",
+        metric_fields={'Feasible': 'is_feasible', 'Dist': 'total_distance', 'Vehicles': 'num_vehicles'},
+    )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
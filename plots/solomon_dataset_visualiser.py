@@ -12,13 +12,15 @@ from ..edge import Edge
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
-def visualize_dataset(file_path: str):
+def visualize_dataset(file_path: str, output_path: str = None):
     """
     Visualizes the nodes of a Solomon dataset.
     The depot is plotted as a star, and customers as dots.
     
     Args:
         file_path (str): The path to the Solomon VRPTW CSV file.
+        output_path (str): Optional image path. If given, the figure is saved
+                           there instead of being shown interactively.
     """
     try:
         # Load the graph using the existing function
@@ -53,8 +55,13 @@ def visualize_dataset(file_path: str):
         plt.grid(True, linestyle='--', alpha=0.6)
         plt.axis('equal') # Ensure the scale is the same on both axes
         
-        # Show the plot
-        plt.show()
+        # Save the plot when running headless, otherwise show it
+        if output_path:
+            plt.savefig(output_path, bbox_inches='tight')
+            plt.close()
+            logger.info(f"Dataset plot saved to {output_path}")
+        else:
+            plt.show()
         
     except FileNotFoundError:
         logger.error(f"Error: The specified file was not found: {file_path}")
@@ -1,11 +1,20 @@
+import functools
+import itertools
+
 from dwave.system import DWaveSampler, EmbeddingComposite, LeapHybridSampler
 from dwave.samplers import SimulatedAnnealingSampler
+import dimod
+import numpy as np
 from dimod import ExactSolver
 
+@functools.lru_cache(maxsize=None)
 def get_solver(solver_type):
     """
     Returns appropriate solver based on type.
     Uses latest D-Wave Ocean SDK components.
+
+    Samplers are cached per process, so repeated calls reuse the same
+    instance instead of reopening a Leap session (QPU/hybrid) each time.
     """
     if solver_type == 'qpu':
         # Requires a real D-Wave account and API key
@@ -22,23 +31,58 @@ def get_solver(solver_type):
     else:
         raise ValueError(f"Solver type '{solver_type}' is not supported.")
 
+def qubo_to_bqm(qubo_dict):
+    """
+    Converts a {(u, v): bias} QUBO dict into a dimod.BinaryQuadraticModel.
+
+    Variables are interned to integer indices in first-appearance order and the
+    biases handed to dimod as COO-style (row, col, value) arrays, which is
+    cheaper than letting from_qubo walk the dict of tuple keys.
+    """
+    index = {}
+    rows = np.empty(len(qubo_dict), dtype=np.int64)
+    cols = np.empty(len(qubo_dict), dtype=np.int64)
+    vals = np.empty(len(qubo_dict), dtype=np.float64)
+    for n, ((u, v), bias) in enumerate(qubo_dict.items()):
+        rows[n] = index.setdefault(u, len(index))
+        cols[n] = index.setdefault(v, len(index))
+        vals[n] = bias
+
+    # Keys are unique, so each diagonal entry is a variable's whole linear bias
+    diagonal = rows == cols
+    linear = np.zeros(len(index), dtype=np.float64)
+    linear[rows[diagonal]] = vals[diagonal]
+    off_diagonal = ~diagonal
+    quadratic = (rows[off_diagonal], cols[off_diagonal], vals[off_diagonal])
+    return dimod.BinaryQuadraticModel.from_numpy_vectors(
+        linear, quadratic, 0.0, dimod.BINARY, variable_order=list(index)
+    )
+
 def solve_qubo(qubo, solver_type='simulated', limit=1, num_reads=50):
     """
     Solve QUBO using specified solver type.
     Updated for latest Ocean SDK.
+
+    `qubo` may be a Qubo or an already built dimod.BinaryQuadraticModel, so
+    callers that sample the same problem repeatedly can convert it once.
     """
     sampler = get_solver(solver_type)
+
+    if isinstance(qubo, dimod.BinaryQuadraticModel):
+        bqm = qubo
+    else:
+        bqm = qubo_to_bqm(qubo.dict)
     
     # Handle different solver types appropriately
     if solver_type == 'hybrid':
         # Hybrid solver doesn't use num_reads parameter
-        response = sampler.sample_qubo(qubo.dict)
+        response = sampler.sample(bqm)
     elif solver_type == 'exact':
         # Exact solver doesn't use num_reads parameter
-        response = sampler.sample_qubo(qubo.dict)
+        response = sampler.sample(bqm)
     else:
         # QPU and simulated annealing use num_reads
-        response = sampler.sample_qubo(qubo.dict, num_reads=num_reads)
+        response = sampler.sample(bqm, num_reads=num_reads)
     
-    # Return the lowest energy samples
-    return [sample for sample in response.lowest()][:limit]
\ No newline at end of file
+    # Return the lowest energy samples, pulling no more than `limit` of them
+    return list(itertools.islice(response.lowest(), limit))
\ No newline at end of file
@@ -1,47 +1,88 @@
+import itertools
+
+import numpy as np
+
+
 class Qubo:
     def __init__(self):
         self.dict = {}
 
     def add(self, key, value):
         if isinstance(key, tuple) and len(key) == 2:
+            # Canonical (lower, higher) order, as sorted() would give, without building a list
+            u, v = key
             try:
-                sorted_key = tuple(sorted(key))
+                if v < u:
+                    key = (v, u)
             except TypeError:
-                sorted_key = tuple(sorted(key, key=str))
+                if str(v) < str(u):
+                    key = (v, u)
 
-            self.dict.setdefault(sorted_key, 0)
-            self.dict[sorted_key] += value
-        else:
-            self.dict.setdefault(key, 0)
-            self.dict[key] += value
+        self.dict[key] = self.dict.get(key, 0) + value
+
+    def bulk_add(self, keys, values):
+        """Adds many (u, v) pair terms at once; equivalent to calling add for each."""
+        qubo_dict = self.dict
+        get = qubo_dict.get
+        for key, value in zip(keys, values):
+            u, v = key
+            try:
+                if v < u:
+                    key = (v, u)
+            except TypeError:
+                if str(v) < str(u):
+                    key = (v, u)
+            qubo_dict[key] = get(key, 0) + value
+
+    def add_all_pairs(self, variables, value):
+        """
+        Adds ``value`` to every pair of distinct ``variables``.
+
+        Sorting the variables once makes every pair from combinations() come out
+        in canonical order already, so the per-pair comparison done by add and
+        bulk_add is skipped. Labels that do not compare go through bulk_add.
+        """
+        variables = list(variables)
+        try:
+            variables = sorted(variables)
+        except TypeError:
+            self.bulk_add(itertools.combinations(variables, 2), itertools.repeat(value))
+            return
+
+        qubo_dict = self.dict
+        get = qubo_dict.get
+        for key in itertools.combinations(variables, 2):
+            qubo_dict[key] = get(key, 0) + value
 
     def add_only_one_constraint(self, variables, penalty):
         
         # Linear terms: -penalty for each variable
-        for var in variables:
-            self.add((var, var), -penalty)
+        self.bulk_add(((var, var) for var in variables), itertools.repeat(-penalty))
         
         # Quadratic terms: 2*penalty for each pair
-        for i in range(len(variables)):
-            for j in range(i + 1, len(variables)):
-                self.add((variables[i], variables[j]), 2 * penalty)
+        self.add_all_pairs(variables, 2 * penalty)
 
     def add_at_most_one_constraint(self, variables, penalty):
         
-        for i in range(len(variables)):
-            for j in range(i + 1, len(variables)):
-                self.add((variables[i], variables[j]), penalty)
+        self.add_all_pairs(variables, penalty)
 
     def add_quadratic_equality_constraint(self, linear_expression, constant, penalty):
+        """
+        Adds penalty * (sum(coeff * var) + constant)^2 for a list of
+        (coeff, var) pairs. All coefficients are expanded at once with numpy.
+        """
+        if not linear_expression:
+            return
+        coeffs, variables = zip(*linear_expression)
+        coeffs = np.asarray(coeffs)
+
+        # Linear terms: ai^2 + 2*c*ai (xi^2 == xi for binary variables)
+        linear = penalty * (coeffs * coeffs + 2 * constant * coeffs)
+        self.bulk_add(((var, var) for var in variables), linear.tolist())
         
-        for coeff, var in linear_expression:
-            self.add((var, var), penalty * (coeff * coeff + 2 * constant * coeff))
-        
-        # Quadratic terms: 2*ai*aj*xi*xj
-        for i in range(len(linear_expression)):
-            for j in range(i + 1, len(linear_expression)):
-                coeff1, var1 = linear_expression[i]
-                coeff2, var2 = linear_expression[j]
-                self.add((var1, var2), penalty * (2 * coeff1 * coeff2))
+        # Quadratic terms: 2*ai*aj*xi*xj, in the same (i < j) order as combinations()
+        rows, cols = np.triu_indices(len(variables), k=1)
+        quadratic = penalty * (2 * coeffs[rows] * coeffs[cols])
+        self.bulk_add(itertools.combinations(variables, 2), quadratic.tolist())
         
-        # Constant term c^2 doesn't affect optimization (no variables), so we can ignore it
\ No newline at end of file
+        # Constant term c^2 doesn't affect optimization (no variables), so we can ignore it
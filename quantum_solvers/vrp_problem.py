@@ -1,5 +1,7 @@
 import math
+import numpy as np
 from .qubo_solver import Qubo
+from .DWaveSolvers_modified import qubo_to_bqm
 
 class VRPProblem:
     def __init__(self, source_depot, costs, time_costs, capacities, dests, weights, time_windows, service_times):
@@ -11,6 +13,15 @@ class VRPProblem:
         self.weights = weights
         self.time_windows = time_windows
         self.service_times = service_times
+
+        # Dense copy of the cost matrix for whole-row/column arithmetic in get_qubo
+        self._cost_mat = np.asarray(costs, dtype=np.float64)
+        self._time_mat = np.asarray(time_costs, dtype=np.float64)
+
+        # Built QUBOs keyed by the get_qubo arguments; the problem data never changes
+        self._qubo_cache = {}
+        # dimod models of those QUBOs, converted on first use: id(qubo) -> (qubo, bqm)
+        self._bqm_cache = {}
         
         # PRE-CALCULATION: True Earliest Possible Arrival Times
         # No matter where you come from, you cannot arrive at J earlier than
@@ -26,10 +37,46 @@ class VRPProblem:
             arrival_limit = max(self.time_windows[j][0], depot_start + travel_from_depot)
             self.true_earliest[j] = arrival_limit
 
+        # Per-customer attributes as arrays aligned with dests, so get_qubo can
+        # work on whole columns instead of probing the dicts customer by customer
+        self._dest_idx = np.asarray(dests, dtype=np.intp)
+        self._earliest = np.array([self.true_earliest[j] for j in dests], dtype=np.float64)
+        self._service = np.array([service_times[j] for j in dests], dtype=np.float64)
+        self._due = np.array([time_windows[j][1] for j in dests], dtype=np.float64)
+        self._demands = [weights.get(j, 0) for j in dests]
+
+        # Time window feasibility between customers depends only on the problem
+        # data, so it is worked out here once instead of on every get_qubo call.
+        # TRUE EARLIEST LEAVE TIME: arrival_at_j1 >= self.true_earliest[j1]
+        # _arrival[a, b] is the earliest arrival at customer b when coming from customer a
+        self._travel = self._time_mat[np.ix_(self._dest_idx, self._dest_idx)]
+        self._off_diagonal = ~np.eye(len(dests), dtype=bool)
+        self._arrival = (self._earliest + self._service)[:, None] + self._travel
+        # 1. HARD CHECK: the link is physically impossible
+        self._tw_hard = (self._arrival > self._due[None, :]) & self._off_diagonal
+        # 2. RISK CHECK (Soft Constraint)
+        # Even if possible, if it's tight, penalize it to avoid accumulated error
+        self._tw_risk = (self._arrival > self._due[None, :] * 0.9) & self._off_diagonal & ~self._tw_hard
+        # Customers that are late even when driven to straight from the depot
+        self._late_from_depot = [j for j, late in zip(dests, (self._earliest > self._due).tolist()) if late]
+        # (j1, j3) pairs no j2 can bridge; only needed for k_max >= 3, so built on first use
+        self._unbridgeable_pairs = None
+
     def get_qubo(self, vehicle_k_limits, only_one_const, order_const, capacity_penalty, time_window_penalty, vehicle_start_cost):
         """
         Generates the QUBO for the CVRPTW with PHYSICS-AWARE TIME CONSTRAINTS.
+
+        Variables are (vehicle, customer, step) triples plus capacity slack bits.
+        Steps are capped per vehicle by ``vehicle_k_limits`` (the solvers use
+        about N/V + 1), so the model has roughly N * (N + V) route variables.
+
+        The result is cached per argument set and shared between callers,
+        so it must not be modified.
         """
+        cache_key = (tuple(vehicle_k_limits), only_one_const, order_const, capacity_penalty, time_window_penalty, vehicle_start_cost)
+        if cache_key in self._qubo_cache:
+            return self._qubo_cache[cache_key]
+
         num_vehicles = len(self.capacities)
         customer_nodes = self.dests
         
@@ -41,21 +88,18 @@ class VRPProblem:
         penalty_scale = only_one_const
         
         # Each customer visited exactly once
+        vehicle_steps = [(i, k) for i in range(num_vehicles) for k in range(vehicle_k_limits[i])]
         for j in customer_nodes:
-            variables = [(i, j, k) for i in range(num_vehicles) for k in range(vehicle_k_limits[i])]
-            for var in variables:
-                qubo.add((var, var), -penalty_scale)
-            for i in range(len(variables)):
-                for j_idx in range(i + 1, len(variables)):
-                    qubo.add((variables[i], variables[j_idx]), 2 * penalty_scale)
+            variables = [(i, j, k) for i, k in vehicle_steps]
+            qubo.add_only_one_constraint(variables, penalty_scale)
 
         # Each vehicle at most one customer per step
+        # (these pairs differ in customer, the ones above share it, so the two
+        # blocks write disjoint QUBO entries and cannot be folded together)
         for i in range(num_vehicles):
             for k in range(vehicle_k_limits[i]):
                 variables = [(i, j, k) for j in customer_nodes]
-                for idx1 in range(len(variables)):
-                    for idx2 in range(idx1 + 1, len(variables)):
-                        qubo.add((variables[idx1], variables[idx2]), penalty_scale)
+                qubo.add_at_most_one_constraint(variables, penalty_scale)
 
         # =================================================================
         # 2. ROUTE CONTINUITY & SELF-LOOPS
@@ -63,15 +107,16 @@ class VRPProblem:
         continuity_penalty = only_one_const * 0.1
         selfloop_penalty = only_one_const * 0.5
         
+        # One linear term followed by a coupling to every customer at the previous step
+        continuity_values = [continuity_penalty] + [-continuity_penalty * 0.5] * len(customer_nodes)
+
         for i in range(num_vehicles):
             # Continuity: Penalize gaps (using k without k-1)
             for k in range(1, vehicle_k_limits[i]):
+                prev_vars = [(i, j_prev, k - 1) for j_prev in customer_nodes]
                 for j in customer_nodes:
                     var_k = (i, j, k)
-                    qubo.add((var_k, var_k), continuity_penalty)
-                    for j_prev in customer_nodes:
-                        var_k_prev = (i, j_prev, k - 1)
-                        qubo.add((var_k, var_k_prev), -continuity_penalty * 0.5)
+                    qubo.bulk_add([(var_k, var_k)] + [(var_k, var_k_prev) for var_k_prev in prev_vars], continuity_values)
 
             # Self-loops: Cannot visit same node twice in a row
             for k in range(vehicle_k_limits[i] - 1):
@@ -81,6 +126,7 @@ class VRPProblem:
         # =================================================================
         # 3. CAPACITY CONSTRAINT (Logarithmic Slack)
         # =================================================================
+        demands = self._demands
         for i in range(num_vehicles):
             capacity = self.capacities[i]
             if capacity <= 0: continue
@@ -88,11 +134,8 @@ class VRPProblem:
             num_slack_bits = math.floor(math.log2(capacity)) + 1
             slack_vars = [('s', i, m) for m in range(num_slack_bits)]
             
-            constraint_expr = []
-            for j in customer_nodes:
-                demand = self.weights.get(j, 0)
-                for k in range(vehicle_k_limits[i]):
-                    constraint_expr.append((demand, (i, j, k)))
+            steps = range(vehicle_k_limits[i])
+            constraint_expr = [(demand, (i, j, k)) for j, demand in zip(customer_nodes, demands) for k in steps]
             
             for m in range(num_slack_bits):
                 constraint_expr.append((2**m, slack_vars[m]))
@@ -103,97 +146,132 @@ class VRPProblem:
         # 4. PHYSICS-AWARE TIME WINDOW CONSTRAINTS
         # =================================================================
         
-        # A. DEPOT INITIAL CHECK
-        # If a customer is so far that even driving straight from depot makes them late
-        for i in range(num_vehicles):
-            for j1 in customer_nodes:
-                if self.true_earliest[j1] > self.time_windows[j1][1]:
-                    qubo.add(((i, j1, 0), (i, j1, 0)), time_window_penalty)
-
-        # B. PAIRWISE CHECK (Step k -> Step k+1)
-        # Using TRUE EARLIEST times instead of naive window open times
-        for i in range(num_vehicles):
-            k_max = vehicle_k_limits[i]
-            for j1 in customer_nodes:
-                for j2 in customer_nodes:
-                    if j1 == j2: continue
-                    
-                    # TRUE EARLIEST LEAVE TIME
-                    # We use the pre-calculated strict lower bound
-                    # arrival_at_j1 >= self.true_earliest[j1]
-                    earliest_leave_j1 = self.true_earliest[j1] + self.service_times[j1]
-                    earliest_arrival_j2 = earliest_leave_j1 + self.time_costs[j1][j2]
-                    
-                    # 1. HARD CHECK
-                    if earliest_arrival_j2 > self.time_windows[j2][1]:
-                        # This link is physically impossible
-                        for k in range(k_max - 1):
-                            qubo.add(((i, j1, k), (i, j2, k + 1)), time_window_penalty)
-                    
-                    # 2. RISK CHECK (Soft Constraint)
-                    # Even if possible, if it's tight, penalize it to avoid accumulated error
-                    elif earliest_arrival_j2 > self.time_windows[j2][1] * 0.9: 
-                        risk_penalty = time_window_penalty * 0.05 
-                        for k in range(k_max - 1):
-                            qubo.add(((i, j1, k), (i, j2, k + 1)), risk_penalty)
-
-        # C. TRIANGLE LOOKAHEAD (Step k -> Step k+2)
-        # Stricter version using True Earliest
-        for i in range(num_vehicles):
-            k_max = vehicle_k_limits[i]
-            if k_max < 3: continue 
-            
-            for j1 in customer_nodes:      
-                for j3 in customer_nodes:  
-                    if j1 == j3: continue
-                    
-                    earliest_leave_j1 = self.true_earliest[j1] + self.service_times[j1]
-                    
-                    # Can we bridge j1 -> j2 -> j3?
-                    possible_connection = False
-                    for j2 in customer_nodes:
-                        if j2 == j1 or j2 == j3: continue
-                        
-                        arrival_j2 = earliest_leave_j1 + self.time_costs[j1][j2]
-                        if arrival_j2 > self.time_windows[j2][1]: continue # Can't reach mid
-                        
-                        # Wait at j2 if early
-                        leave_j2 = max(arrival_j2, self.true_earliest[j2]) + self.service_times[j2]
-                        arrival_j3 = leave_j2 + self.time_costs[j2][j3]
-                        
-                        if arrival_j3 <= self.time_windows[j3][1]:
-                            possible_connection = True
-                            break 
-                    
-                    if not possible_connection:
-                        for k in range(k_max - 2):
-                            qubo.add(((i, j1, k), (i, j3, k + 2)), time_window_penalty)
+        # The pairwise (step k -> k + 1) penalties share their keys with the
+        # savings terms below, so they are returned and emitted in section 5
+        time_window_pairs = None
+        if time_window_penalty != 0:
+            time_window_pairs = self._add_time_window_terms(qubo, vehicle_k_limits, time_window_penalty)
 
         # =================================================================
         # 5. OBJECTIVE FUNCTION (Clarke-Wright Savings)
         # =================================================================
+        depot = self.source_depot
+        dest_idx = self._dest_idx
+        to_depot = self._cost_mat[dest_idx, depot]
+        from_depot = self._cost_mat[depot, dest_idx]
+        round_trip = ((from_depot + to_depot) * order_const).tolist()
+        savings = (self._cost_mat[np.ix_(dest_idx, dest_idx)] - to_depot[:, None] - from_depot[None, :]) * order_const
+
+        # Near-zero coefficients only add entries to the QUBO, not information
+        eps = 1e-12
+        # Step 0 also pays the vehicle start cost; only non-negligible terms are kept
+        first_step_terms = [(j, w + vehicle_start_cost) for j, w in zip(customer_nodes, round_trip) if abs(w + vehicle_start_cost) >= eps]
+        later_step_terms = [(j, w) for j, w in zip(customer_nodes, round_trip) if abs(w) >= eps]
+        # Off-diagonal (j1 != j2) pairs with a non-negligible saving, in row-major order,
+        # with the pairwise time window penalties folded into the same coefficients
+        transition_mask = ~np.eye(len(customer_nodes), dtype=bool) & (np.abs(savings) >= eps)
+        transition = np.where(transition_mask, savings, 0.0)
+        if time_window_pairs is not None:
+            transition += time_window_pairs
+            transition_mask |= time_window_pairs != 0
+        pair_rows, pair_cols = np.nonzero(transition_mask)
+        transition_pairs = [(customer_nodes[a], customer_nodes[b]) for a, b in zip(pair_rows.tolist(), pair_cols.tolist())]
+        transition_values = transition[transition_mask].tolist()
+
         for i in range(num_vehicles):
             k_max = vehicle_k_limits[i]
             
             # Linear Terms: Base cost (Round trip assumption)
             for k in range(k_max):
-                for j in customer_nodes:
-                    cost_round_trip = self.costs[self.source_depot][j] + self.costs[j][self.source_depot]
-                    penalty_val = cost_round_trip * order_const
-                    if k == 0:
-                        penalty_val += vehicle_start_cost
+                for j, penalty_val in (first_step_terms if k == 0 else later_step_terms):
                     qubo.add(((i, j, k), (i, j, k)), penalty_val)
 
             # Quadratic Terms: Savings (Connecting j1 -> j2 saves return trip)
+            # plus the time window penalty for risky or impossible links
             for k in range(k_max - 1):
-                for j1 in customer_nodes:
-                    for j2 in customer_nodes:
-                        if j1 == j2: continue
-                        var1 = (i, j1, k)
-                        var2 = (i, j2, k + 1)
-                        savings_cost = (self.costs[j1][j2] 
-                                      - self.costs[j1][self.source_depot] 
-                                      - self.costs[self.source_depot][j2])
-                        qubo.add((var1, var2), savings_cost * order_const)
-
-        return qubo
\ No newline at end of file
+                qubo.bulk_add([((i, j1, k), (i, j2, k + 1)) for j1, j2 in transition_pairs], transition_values)
+
+        self._qubo_cache[cache_key] = qubo
+        return qubo
+
+    def get_bqm(self, qubo):
+        """
+        Returns the dimod.BinaryQuadraticModel for a QUBO returned by get_qubo.
+
+        Each cached QUBO is converted once, so repeated solves of the same
+        problem (e.g. across tuning trials) sample the stored model directly.
+        """
+        entry = self._bqm_cache.get(id(qubo))
+        if entry is None or entry[0] is not qubo:
+            entry = (qubo, qubo_to_bqm(qubo.dict))
+            self._bqm_cache[id(qubo)] = entry
+        return entry[1]
+
+    def _add_time_window_terms(self, qubo, vehicle_k_limits, time_window_penalty):
+        """
+        Adds the physics-aware time window penalties (section 4 of get_qubo) to ``qubo``.
+
+        The depot and lookahead penalties are added directly. The pairwise
+        penalties are returned as an array over [j1, j2] customer positions
+        instead, for get_qubo to emit together with the savings terms.
+        """
+        num_vehicles = len(self.capacities)
+
+        # A. DEPOT INITIAL CHECK
+        # If a customer is so far that even driving straight from depot makes them late
+        for i in range(num_vehicles):
+            for j1 in self._late_from_depot:
+                qubo.add(((i, j1, 0), (i, j1, 0)), time_window_penalty)
+
+        # The pairwise and lookahead checks only depend on the customers, not on
+        # the vehicle, so they are evaluated once (as arrays over customer
+        # positions) and replayed for every vehicle.
+
+        # B. PAIRWISE CHECK (Step k -> Step k+1)
+        # Using TRUE EARLIEST times instead of naive window open times
+        risk_penalty = time_window_penalty * 0.05
+        pair_penalties = np.where(self._tw_hard, time_window_penalty, np.where(self._tw_risk, risk_penalty, 0.0))
+
+        # C. TRIANGLE LOOKAHEAD (Step k -> Step k+2)
+        if any(k_max >= 3 for k_max in vehicle_k_limits):
+            if self._unbridgeable_pairs is None:
+                self._unbridgeable_pairs = self._find_unbridgeable_pairs()
+
+            for i in range(num_vehicles):
+                k_max = vehicle_k_limits[i]
+                if k_max < 3: continue
+
+                keys = [((i, j1, k), (i, j3, k + 2)) for j1, j3 in self._unbridgeable_pairs for k in range(k_max - 2)]
+                qubo.bulk_add(keys, [time_window_penalty] * len(keys))
+
+        return pair_penalties
+
+    def _find_unbridgeable_pairs(self):
+        """
+        Stricter version using True Earliest: can we bridge j1 -> j2 -> j3?
+        Returns the (j1, j3) customer pairs for which no middle stop j2 works.
+        """
+        customer_nodes = self.dests
+        num_customers = len(customer_nodes)
+        service = self._service
+        due = self._due
+        travel = self._travel
+        arrival = self._arrival
+        off_diagonal = self._off_diagonal
+
+        reach_mid = (arrival <= due[None, :]) & off_diagonal  # [j1, j2]: can't reach mid otherwise
+        # Wait at j2 if early
+        leave_mid = np.maximum(arrival, self._earliest[None, :]) + service[None, :]
+        possible_connection = np.zeros((num_customers, num_customers), dtype=bool)
+        for a in range(num_customers):
+            # Only the reachable middles can bridge; with tight windows this
+            # is a handful, and none at all leaves the whole row unbridgeable
+            mids = np.flatnonzero(reach_mid[a])
+            if mids.size == 0:
+                continue
+            reach_end = (leave_mid[a, mids][:, None] + travel[mids, :]) <= due[None, :]  # [j2, j3]
+            possible_connection[a] = (reach_end & off_diagonal[mids, :]).any(axis=0)  # j2 != j3
+        return [
+            (customer_nodes[a], customer_nodes[b])
+            for a, b in zip(*np.nonzero(~possible_connection & off_diagonal))
+        ]
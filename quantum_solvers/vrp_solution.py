@@ -1,3 +1,9 @@
+import itertools
+import logging
+
+logger = logging.getLogger(__name__)
+
+
 class VRPSolution:
     def __init__(self, problem, sample, vehicle_k_limits, solution=None):
         self.problem = problem
@@ -7,18 +13,23 @@ class VRPSolution:
             self.solution = solution
         else:
             num_vehicles = len(self.problem.capacities)
-            temp_routes = {i: [] for i in range(num_vehicles)}
+            # One bucket per step, so visits come out in step order without sorting
+            temp_routes = [[[] for _ in range(k_limit)] for k_limit in vehicle_k_limits[:num_vehicles]]
+            temp_routes += [[] for _ in range(num_vehicles - len(temp_routes))]
 
-            for var, val in sample.items():
-                if val == 1 and isinstance(var, tuple) and len(var) == 3 and isinstance(var[0], int):
+            # Only the few variables set to 1 need the routing-variable checks
+            for var in [var for var, val in sample.items() if val == 1]:
+                if isinstance(var, tuple) and len(var) == 3 and isinstance(var[0], int):
                     i, j, k = var
                     if i < num_vehicles:
-                        temp_routes[i].append((k, j))
+                        steps = temp_routes[i]
+                        while len(steps) <= k:
+                            steps.append([])
+                        steps[k].append(j)
 
             final_routes = []
-            for i in range(num_vehicles):
-                sorted_visits = sorted(temp_routes[i], key=lambda x: x[0])
-                route = [j for k, j in sorted_visits]
+            for steps in temp_routes:
+                route = [j for step in steps for j in step]
                 if route:
                     final_routes.append(route)
             
@@ -30,25 +41,31 @@ class VRPSolution:
         optionally including a candidate node appended to the end.
         Returns float('inf') if any node in the chain is late.
         """
+        time_windows = self.problem.time_windows
+        time_costs = self.problem.time_costs
+        service_times = self.problem.service_times
+
         current_time = 0.0
         last_node = self.depot
         
-        depot_ready = self.problem.time_windows[self.depot][0]
+        depot_ready = time_windows[self.depot][0]
         current_time = max(current_time, depot_ready)
         
-        full_route = route + ([candidate_node] if candidate_node is not None else [])
+        # Walk the route and then the candidate without copying the route
+        full_route = itertools.chain(route, (candidate_node,)) if candidate_node is not None else route
         
         for node in full_route:
-            travel_time = self.problem.time_costs[last_node][node]  # use time_costs
+            travel_time = time_costs[last_node][node]  # use time_costs
             current_time += travel_time
             
-            ready_time, due_date = self.problem.time_windows[node]
+            ready_time, due_date = time_windows[node]
             
             if current_time > due_date:
                 return float('inf')
             
-            current_time = max(current_time, ready_time)
-            current_time += self.problem.service_times[node]
+            if current_time < ready_time:
+                current_time = ready_time
+            current_time += service_times[node]
             last_node = node
             
         return current_time
@@ -78,23 +95,30 @@ class VRPSolution:
         missing = all_customers - visited
         
         if missing:
+            costs = self.problem.costs
+            weights = self.problem.weights
+            capacities = self.problem.capacities
+            # Current load per repaired route, kept up to date as customers are inserted
+            route_demands = [sum(weights.get(c, 0) for c in route) for route in repaired_routes]
+
             for customer in missing:
                 best_route_idx = -1
                 best_cost = float('inf')
                 
                 if not repaired_routes:
                     repaired_routes.append([customer])
+                    route_demands.append(weights.get(customer, 0))
                     continue
                 
+                customer_demand = weights.get(customer, 0)
                 for idx, route in enumerate(repaired_routes):
                     if not route: continue
 
                     last_customer = route[-1]
-                    cost = self.problem.costs[last_customer][customer]
+                    cost = costs[last_customer][customer]
                     
-                    route_demand = sum(self.problem.weights.get(c, 0) for c in route)
-                    customer_demand = self.problem.weights.get(customer, 0)
-                    vehicle_capacity = self.problem.capacities[idx] if idx < len(self.problem.capacities) else self.problem.capacities[0]
+                    route_demand = route_demands[idx]
+                    vehicle_capacity = capacities[idx] if idx < len(capacities) else capacities[0]
                     
                     if route_demand + customer_demand > vehicle_capacity:
                         continue
@@ -109,8 +133,10 @@ class VRPSolution:
                 
                 if best_route_idx != -1:
                     repaired_routes[best_route_idx].append(customer)
+                    route_demands[best_route_idx] += customer_demand
                 else:
                     repaired_routes.append([customer])
+                    route_demands.append(customer_demand)
         
         return repaired_routes
     
@@ -133,72 +159,64 @@ class VRPSolution:
         time_windows  = self.problem.time_windows
         service_times = self.problem.service_times
         time_costs    = self.problem.time_costs   # FIX: was self.problem.costs
+        depot = self.depot
+        num_capacities = len(capacities)
 
         visited_customers = set()
         for i, route in enumerate(self.solution):
 
-            # ── Duplicate check ───────────────────────────────────────────
+            # ── Duplicate + capacity check (one pass) ─────────────────────
+            current_load = 0
             for customer in route:
                 if customer in visited_customers:
                     return False
                 visited_customers.add(customer)
-            
-            # ── Capacity check ────────────────────────────────────────────
-            current_load = sum(weights.get(dest, 0) for dest in route)
-            if i < len(capacities) and current_load > capacities[i]:
+                current_load += weights.get(customer, 0)
+            if i < num_capacities and current_load > capacities[i]:
                 return False
 
             if not route:
                 continue
             
             # ── Time window check ─────────────────────────────────────────
-            current_time = 0.0
-            
-            depot_ready = time_windows[self.depot][0]
-            current_time = max(current_time, depot_ready)
-            
-            # Depot → first stop
-            current_time += time_costs[self.depot][route[0]]   # FIX: was costs
-            
-            ready_time, due_date = time_windows[route[0]]
-            if current_time > due_date:
-                return False
-            current_time = max(current_time, ready_time)
-            current_time += service_times[route[0]]
-
-            # Each subsequent stop
-            for stop_idx in range(len(route) - 1):
-                from_node = route[stop_idx]
-                to_node   = route[stop_idx + 1]
-
+            # Depot → first stop, then each subsequent stop
+            current_time = max(0.0, time_windows[depot][0])
+            from_node = depot
+            for to_node in route:
                 current_time += time_costs[from_node][to_node]  # FIX: was costs
-                
+
                 ready_time, due_date = time_windows[to_node]
                 if current_time > due_date:
                     return False
-                current_time = max(current_time, ready_time)
+                if current_time < ready_time:
+                    current_time = ready_time
                 current_time += service_times[to_node]
+                from_node = to_node
 
         # ── Completeness check ────────────────────────────────────────────
-        required_customers = set(self.problem.dests)
-        if visited_customers != required_customers:
-            missing = required_customers - visited_customers
-            print(f"Error: Solution is incomplete. Missing customers: {missing}")
+        # No duplicates were found above, so matching size and coverage means
+        # the same customer set, without building a set of dests on every call
+        dests = self.problem.dests
+        if len(visited_customers) != len(dests) or not visited_customers.issuperset(dests):
+            missing = set(dests) - visited_customers
+            logger.debug("Solution is incomplete. Missing customers: %s", missing)
             return False
 
         return True
 
     def total_cost(self):
+        costs = self.problem.costs
+        depot = self.depot
         total_cost = 0
         for route in self.solution:
             if not route: continue
             
-            route_cost = self.problem.costs[self.depot][route[0]]
+            route_cost = costs[depot][route[0]]
             
-            for i in range(len(route) - 1):
-                route_cost += self.problem.costs[route[i]][route[i+1]]
+            for from_node, to_node in zip(route, route[1:]):
+                route_cost += costs[from_node][to_node]
             
-            route_cost += self.problem.costs[route[-1]][self.depot]
+            route_cost += costs[route[-1]][depot]
             
             total_cost += route_cost
         return total_cost
@@ -1,7 +1,13 @@
+import logging
 import math
 from . import DWaveSolvers_modified as DWaveSolvers
 from .vrp_solution import VRPSolution
 
+logger = logging.getLogger(__name__)
+
+# Upper bound on lowest-energy samples decoded per solve; ties are often identical
+MAX_CANDIDATE_SAMPLES = 10
+
 class VRPSolver:
     def __init__(self, problem):
         self.problem = problem
@@ -9,6 +15,29 @@ class VRPSolver:
     def solve(self, only_one_const, order_const, capacity_penalty, time_window_penalty, vehicle_start_cost, solver_type, num_reads):
         pass
 
+    def _best_solution(self, samples, vehicle_k_limits):
+        """
+        Decodes every returned sample and keeps the cheapest feasible solution.
+        Falls back to the first (lowest energy) sample when none is feasible.
+        Samples that decode to the same routes are only checked once.
+        """
+        solutions = [VRPSolution(self.problem, sample, vehicle_k_limits) for sample in samples]
+        if len(solutions) == 1:
+            return solutions[0]
+        seen = set()
+        feasible = []
+        for solution in solutions:
+            routes = tuple(map(tuple, solution.solution))
+            if routes in seen:
+                continue
+            seen.add(routes)
+            if solution.check():
+                feasible.append(solution)
+        if not feasible:
+            logger.warning("No feasible solution among %d samples; returning the lowest-energy one.", len(solutions))
+            return solutions[0]
+        return min(feasible, key=lambda solution: solution.total_cost())
+
 class FullQuboSolver(VRPSolver):
     def solve(self, only_one_const, order_const, capacity_penalty, time_window_penalty, vehicle_start_cost, solver_type='simulated', num_reads=50):
         num_customers = len(self.problem.dests)
@@ -25,7 +54,8 @@ class FullQuboSolver(VRPSolver):
         )
         
         try:
-            samples = DWaveSolvers.solve_qubo(vrp_qubo, solver_type=solver_type, limit=1, num_reads=num_reads)
+            # Keep every lowest-energy read; their repaired decodings can differ
+            samples = DWaveSolvers.solve_qubo(self.problem.get_bqm(vrp_qubo), solver_type=solver_type, limit=min(num_reads, MAX_CANDIDATE_SAMPLES), num_reads=num_reads)
         except Exception as e:
             print(f"Solver error: {e}")
             return VRPSolution(self.problem, {}, vehicle_k_limits, solution=[])
@@ -33,8 +63,7 @@ class FullQuboSolver(VRPSolver):
         if not samples:
              return VRPSolution(self.problem, {}, vehicle_k_limits, solution=[])
              
-        solution = VRPSolution(self.problem, samples[0], vehicle_k_limits)
-        return solution
+        return self._best_solution(samples, vehicle_k_limits)
 
 class AveragePartitionSolver(VRPSolver):
     def solve(self, only_one_const, order_const, capacity_penalty, time_window_penalty, vehicle_start_cost, solver_type='simulated', num_reads=50, limit_radius=1):
@@ -50,7 +79,8 @@ class AveragePartitionSolver(VRPSolver):
         )
         
         try:
-            samples = DWaveSolvers.solve_qubo(vrp_qubo, solver_type=solver_type, limit=1, num_reads=num_reads)
+            # Keep every lowest-energy read; their repaired decodings can differ
+            samples = DWaveSolvers.solve_qubo(self.problem.get_bqm(vrp_qubo), solver_type=solver_type, limit=min(num_reads, MAX_CANDIDATE_SAMPLES), num_reads=num_reads)
         except Exception as e:
             print(f"Solver error: {e}")
             return VRPSolution(self.problem, {}, vehicle_k_limits, solution=[])
@@ -58,8 +88,7 @@ class AveragePartitionSolver(VRPSolver):
         if not samples:
              return VRPSolution(self.problem, {}, vehicle_k_limits, solution=[])
              
-        solution = VRPSolution(self.problem, samples[0], vehicle_k_limits)
-        return solution
+        return self._best_solution(samples, vehicle_k_limits)
 
 class IterativeRepairSolver(VRPSolver):
     """
@@ -89,7 +118,7 @@ class IterativeRepairSolver(VRPSolver):
             )
             
             try:
-                samples = DWaveSolvers.solve_qubo(vrp_qubo, solver_type=solver_type, limit=5, num_reads=num_reads)
+                samples = DWaveSolvers.solve_qubo(self.problem.get_bqm(vrp_qubo), solver_type=solver_type, limit=5, num_reads=num_reads)
                 
                 for sample in samples:
                     solution = VRPSolution(self.problem, sample, vehicle_k_limits)
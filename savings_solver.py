@@ -1,9 +1,15 @@
 # savings_solver.py
 import math
+import heapq
+import itertools
+import logging
+from operator import itemgetter
 from .graph import Graph
 from .node import Node
 from .utils import compute_euclidean_tau, calculate_route_metrics
 
+logger = logging.getLogger(__name__)
+
 class SavingsSolver:
     """
     Implements the Clarke and Wright Savings Algorithm for VRPTW.
@@ -13,157 +19,227 @@ class SavingsSolver:
         self.graph = graph
         self.depot_id = depot_id
         self.vehicle_capacity = vehicle_capacity
+        self._customer_ids = tuple(node_id for node_id in graph.nodes if node_id != depot_id)
+
+        # Pairwise travel times, computed once and shared by the savings list and
+        # every merge feasibility check: self._tau[a][b]
+        nodes = graph.nodes
+        self._tau = {
+            id_a: {id_b: compute_euclidean_tau(node_a, node_b) for id_b, node_b in nodes.items()}
+            for id_a, node_a in nodes.items()
+        }
+
+        # Per-node (demand, ready time, due date, service time), so the merge
+        # feasibility walk unpacks one tuple per stop instead of loading attributes
+        self._stop_data = {
+            node_id: (node.demand, node.e, node.l, node.s) for node_id, node in nodes.items()
+        }
 
     def _calculate_savings(self) -> list:
+        customer_ids = self._customer_ids
+        depot_taus = self._tau[self.depot_id]
+
+        # One comprehension per customer row (the upper triangle, j > i), in the
+        # same order the pairwise loop produced, so the stable sort breaks ties the same way
         savings = []
-        customer_ids = [node_id for node_id in self.graph.nodes if node_id != self.depot_id]
-        depot_node = self.graph.nodes[self.depot_id]
-
-        for i in range(len(customer_ids)):
-            for j in range(i + 1, len(customer_ids)):
-                id_i = customer_ids[i]
-                id_j = customer_ids[j]
-                node_i = self.graph.nodes[id_i]
-                node_j = self.graph.nodes[id_j]
-
-                tau_di = compute_euclidean_tau(depot_node, node_i)
-                tau_jd = compute_euclidean_tau(node_j, depot_node)
-                tau_ij = compute_euclidean_tau(node_i, node_j)
-                
-                saving = tau_di + tau_jd - tau_ij
-                savings.append((saving, id_i, id_j))
-        
-        savings.sort(key=lambda x: x[0], reverse=True)
+        for i, id_i in enumerate(customer_ids):
+            taus_i = self._tau[id_i]
+            tau_di = depot_taus[id_i]
+            savings.extend([
+                (tau_di + depot_taus[id_j] - taus_i[id_j], id_i, id_j)
+                for id_j in itertools.islice(customer_ids, i + 1, None)
+            ])
+
+        savings.sort(key=itemgetter(0), reverse=True)
         return savings
 
-    def _check_merge_feasibility(self, route1: list, route2: list, merge_point_i: str, merge_point_j: str) -> bool:
-        idx_i = -1
-        for k in range(len(route1) - 1):
-            if route1[k] == merge_point_i:
-                idx_i = k
-                break
-        
-        idx_j = -1
-        for k in range(1, len(route2)):
-            if route2[k] == merge_point_j:
-                idx_j = k
-                break
-
-        if idx_i == -1 or idx_j == -1:
-            return False
-
-        candidate_route = route1[:idx_i+1] + route2[idx_j:]
-        
-        if candidate_route[0] != self.depot_id:
-            candidate_route.insert(0, self.depot_id)
-        if candidate_route[-1] != self.depot_id:
-            candidate_route.append(self.depot_id)
-
-        current_time = self.graph.nodes[self.depot_id].e
-        current_load = 0.0
-
-        for k in range(len(candidate_route) - 1):
-            from_node_id = candidate_route[k]
-            to_node_id = candidate_route[k+1]
-
-            from_node = self.graph.nodes[from_node_id]
-            to_node = self.graph.nodes[to_node_id]
-
-            if to_node_id != self.depot_id:
-                current_load += to_node.demand
-                if current_load > self.vehicle_capacity:
-                    return False
-
-            travel_time = compute_euclidean_tau(from_node, to_node)
+    def _walk_stops(self, stops, from_node_id, current_time, current_load):
+        """
+        Serves ``stops`` in order, leaving ``from_node_id`` at ``current_time``
+        with ``current_load`` on board. Returns the (last node id, departure
+        time, load) state after the last stop, or None as soon as a capacity or
+        time window is violated.
+        """
+        depot_id = self.depot_id
+        vehicle_capacity = self.vehicle_capacity
+        stop_data = self._stop_data
+        tau = self._tau
+
+        for to_node_id in stops:
+            demand, ready_time, due_date, service_time = stop_data[to_node_id]
+
+            if to_node_id != depot_id:
+                current_load += demand
+                if current_load > vehicle_capacity:
+                    return None
+
+            travel_time = tau[from_node_id][to_node_id]
             arrival_time_at_to_node = current_time + travel_time
-            
-            service_start_time_at_to_node = max(arrival_time_at_to_node, to_node.e)
 
-            if service_start_time_at_to_node > to_node.l:
-                return False
-
-            current_time = service_start_time_at_to_node + to_node.s
-        
-        last_customer_node = self.graph.nodes[candidate_route[-2]]
-        depot_node = self.graph.nodes[self.depot_id]
-        travel_time_to_depot = compute_euclidean_tau(last_customer_node, depot_node)
-        final_arrival_at_depot = current_time + travel_time_to_depot
-        
-        if final_arrival_at_depot > depot_node.l:
-            return False
-
-        return True
+            service_start_time_at_to_node = arrival_time_at_to_node if arrival_time_at_to_node >= ready_time else ready_time
+
+            if service_start_time_at_to_node > due_date:
+                return None
+
+            current_time = service_start_time_at_to_node + service_time
+            from_node_id = to_node_id
+
+        return from_node_id, current_time, current_load
+
+    def _tail_state(self, route: list):
+        """State after serving a route's customers from the depot, or None if infeasible."""
+        depot_id = self.depot_id
+        depot_ready = self._stop_data[depot_id][1]
+        return self._walk_stops(itertools.islice(route, 1, len(route) - 1), depot_id, depot_ready, 0.0)
+
+    def _merged_tail_state(self, route1_state, route2: list):
+        """
+        Continues route1's tail state through route2's customers and checks the
+        return to the depot. Returns the merged route's tail state, or None if
+        the merge is infeasible. Only route2 is walked; route1's part of the
+        schedule is the same as when route1 was built.
+        """
+        if route1_state is None:
+            return None
+        merged_state = self._walk_stops(itertools.islice(route2, 1, len(route2) - 1), *route1_state)
+        if merged_state is None:
+            return None
+
+        depot_id = self.depot_id
+        returned_state = self._walk_stops((depot_id,), *merged_state)
+        if returned_state is None:
+            return None
+
+        travel_time_to_depot = self._tau[route2[-2]][depot_id]
+        final_arrival_at_depot = returned_state[1] + travel_time_to_depot
+
+        if final_arrival_at_depot > self._stop_data[depot_id][2]:
+            return None
+
+        return merged_state
+
+    def _check_merge_feasibility(self, route1: list, route2: list) -> bool:
+        """
+        Checks capacity and time windows for the route that serves route1's
+        customers followed by route2's. Both routes start and end at the depot;
+        solve() only merges end-to-start, so the join is always route1's last
+        customer to route2's first.
+        """
+        return self._merged_tail_state(self._tail_state(route1), route2) is not None
 
     def solve(self) -> tuple[list, dict]:
-        print(f"\n--- Starting Savings Solver on graph with depot {self.depot_id} ---")
+        logger.info("--- Starting Savings Solver on graph with depot %s ---", self.depot_id)
 
+        # Routes are keyed by small integer ids; merged routes take the next free one
         routes = {}
-        customer_ids = [node_id for node_id in self.graph.nodes if node_id != self.depot_id]
-        for cust_id in customer_ids:
-            routes[cust_id] = [self.depot_id, cust_id, self.depot_id]
+        customer_ids = self._customer_ids
+        for route_id, cust_id in enumerate(customer_ids):
+            routes[route_id] = [self.depot_id, cust_id, self.depot_id]
+        next_route_id = len(customer_ids)
         
-        customer_to_route_map = {cust_id: cust_id for cust_id in customer_ids}
+        customer_to_route_map = {cust_id: route_id for route_id, cust_id in enumerate(customer_ids)}
+
+        # Customers at either end of their route. Merges only join ends, so a
+        # customer that becomes interior never becomes mergeable again
+        endpoints = set(customer_ids)
+
+        # Schedule state at each route's last customer, so checking a merge only
+        # walks the appended route
+        tail_states = {route_id: self._tail_state(route) for route_id, route in routes.items()}
 
-        print(f"  Initial routes: {len(customer_ids)} individual routes.")
+        logger.info("  Initial routes: %d individual routes.", len(customer_ids))
 
         savings = self._calculate_savings()
-        print(f"  Calculated {len(savings)} potential savings.")
-
-        merged_any_this_iteration = True
-        while merged_any_this_iteration:
-            merged_any_this_iteration = False
-            for saving_value, id_i, id_j in savings:
-                if id_i not in customer_to_route_map or id_j not in customer_to_route_map:
-                    continue
-
-                route_id_i = customer_to_route_map[id_i]
-                route_id_j = customer_to_route_map[id_j]
-
-                if route_id_i == route_id_j:
-                    continue
-
-                route_i = routes[route_id_i]
-                route_j = routes[route_id_j]
-                
-                can_merge_i_j = (route_i[-2] == id_i and route_j[1] == id_j)
-                can_merge_j_i = (route_j[-2] == id_j and route_i[1] == id_i)
-
-                if not (can_merge_i_j or can_merge_j_i):
-                    continue
-
-                proposed_merged_route = None
-                if can_merge_i_j:
-                    temp_route = route_i[:-1] + route_j[1:]
-                    if self._check_merge_feasibility(route_i, route_j, id_i, id_j):
-                        proposed_merged_route = temp_route
-                
-                if proposed_merged_route is None and can_merge_j_i:
-                    temp_route = route_j[:-1] + route_i[1:]
-                    if self._check_merge_feasibility(route_j, route_i, id_j, id_i):
-                        proposed_merged_route = temp_route
-
-                if proposed_merged_route:
-                    print(f"  Merging routes for {id_i} and {id_j} with saving {saving_value:.2f}")
-                    
-                    new_route_id = f"R_{id_i}_{id_j}"
-                    routes[new_route_id] = proposed_merged_route
-                    
-                    for customer_in_old_route in route_i[1:-1]:
-                        customer_to_route_map[customer_in_old_route] = new_route_id
-                    for customer_in_old_route in route_j[1:-1]:
-                        customer_to_route_map[customer_in_old_route] = new_route_id
-                    
-                    del routes[route_id_i]
-                    del routes[route_id_j]
-                    
-                    merged_any_this_iteration = True
-                    break
-            
-            if not merged_any_this_iteration:
-                break
+        logger.info("  Calculated %d potential savings.", len(savings))
+
+        # Savings indices per customer (ascending), so that after a merge only the
+        # pairs touching the new route's endpoints need to be looked at again
+        pairs_of_customer = {cust_id: [] for cust_id in customer_ids}
+        for index, (_, id_i, id_j) in enumerate(savings):
+            pairs_of_customer[id_i].append(index)
+            pairs_of_customer[id_j].append(index)
+
+        # Walk the savings once, in order. After a merge, only an earlier pair that
+        # touches one of the merged route's two endpoints can have become
+        # mergeable; every other earlier pair would be rejected exactly as before.
+        # Those pairs are queued and retried in savings order before the walk
+        # moves on, which picks the same merges as rescanning from the top.
+        retry = []
+        queued = set()
+        next_index = 0
+        while retry or next_index < len(savings):
+            if retry:
+                index = heapq.heappop(retry)
+                queued.discard(index)
+            else:
+                index = next_index
+                next_index += 1
+            saving_value, id_i, id_j = savings[index]
+
+            if id_i not in endpoints or id_j not in endpoints:
+                continue
+
+            route_id_i = customer_to_route_map[id_i]
+            route_id_j = customer_to_route_map[id_j]
+
+            if route_id_i == route_id_j:
+                continue
+
+            route_i = routes[route_id_i]
+            route_j = routes[route_id_j]
+
+            can_merge_i_j = (route_i[-2] == id_i and route_j[1] == id_j)
+            can_merge_j_i = (route_j[-2] == id_j and route_i[1] == id_i)
+
+            if not (can_merge_i_j or can_merge_j_i):
+                continue
+
+            merged_state = None
+            if can_merge_i_j:
+                merged_state = self._merged_tail_state(tail_states[route_id_i], route_j)
+                proposed_merged_route, appended_route = route_i, route_j
+            if merged_state is None and can_merge_j_i:
+                merged_state = self._merged_tail_state(tail_states[route_id_j], route_i)
+                proposed_merged_route, appended_route = route_j, route_i
+
+            if merged_state is not None:
+                # One line per merge; nothing is formatted unless DEBUG is on
+                logger.debug("  Merging routes for %s and %s with saving %.2f", id_i, id_j, saving_value)
+
+                # Splice in place: drop the closing depot and append the other
+                # route's stops, instead of copying both into a new list
+                junction_tail = proposed_merged_route[-2]
+                junction_head = appended_route[1]
+                proposed_merged_route.pop()
+                proposed_merged_route.extend(itertools.islice(appended_route, 1, None))
+                if junction_tail != proposed_merged_route[1]:
+                    endpoints.discard(junction_tail)
+                if junction_head != proposed_merged_route[-2]:
+                    endpoints.discard(junction_head)
+
+                new_route_id = next_route_id
+                next_route_id += 1
+                routes[new_route_id] = proposed_merged_route
+                tail_states[new_route_id] = merged_state
+
+                for customer_in_old_route in itertools.islice(proposed_merged_route, 1, len(proposed_merged_route) - 1):
+                    customer_to_route_map[customer_in_old_route] = new_route_id
+
+                del routes[route_id_i]
+                del routes[route_id_j]
+                del tail_states[route_id_i]
+                del tail_states[route_id_j]
+
+                for endpoint in (proposed_merged_route[1], proposed_merged_route[-2]):
+                    for earlier in pairs_of_customer[endpoint]:
+                        if earlier >= next_index:
+                            break
+                        if earlier not in queued:
+                            queued.add(earlier)
+                            heapq.heappush(retry, earlier)
 
         final_routes_list = list(routes.values())
-        print(f"--- Savings Solver Finished. Found {len(final_routes_list)} routes. ---")
+        logger.info("--- Savings Solver Finished. Found %d routes. ---", len(final_routes_list))
         
         metrics = calculate_route_metrics(self.graph, final_routes_list, self.depot_id, self.vehicle_capacity)
         return final_routes_list, metrics
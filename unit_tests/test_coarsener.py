@@ -71,3 +71,12 @@ def test_compute_new_window_ab(simple_ab_graph):
     assert pytest.approx(e_prime) == 0.0
     assert pytest.approx(l_prime) == 9.0 # Corrected expected l_prime
 
+
+def test_graph_edge_lookup_is_undirected(simple_ab_graph):
+    # Duplicate inserts in either direction are ignored
+    assert len(simple_ab_graph.edges) == 4
+    assert simple_ab_graph.get_edge_by_nodes("B", "A") is simple_ab_graph.get_edge_by_nodes("A", "B")
+
+    simple_ab_graph.remove_node("A")
+    assert simple_ab_graph.get_edge_by_nodes("A", "B") is None
+    assert simple_ab_graph.get_edge_by_nodes("D", "B") is not None
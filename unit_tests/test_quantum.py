@@ -43,6 +43,37 @@ class TestQuboSolver(unittest.TestCase):
         self.assertEqual(q.dict[('y', 'y')], -penalty)
         self.assertEqual(q.dict[('x', 'y')], 2 * penalty)
 
+    def test_bulk_add_matches_add(self):
+        keys = [((0, 1, 0), ('s', 0, 1)), ((1, 2, 0), (0, 1, 0)), ((0, 1, 0), (1, 2, 0))]
+        expected = Qubo()
+        for key in keys:
+            expected.add(key, 2)
+        q = Qubo()
+        q.bulk_add(keys, [2] * len(keys))
+        self.assertEqual(q.dict, expected.dict)
+
+    def test_quadratic_equality_constraint(self):
+        q = Qubo()
+        q.add_quadratic_equality_constraint([(2, (0, 1, 0)), (3, (0, 2, 0)), (1, ('s', 0, 0))], -4, 10)
+        # 10 * (2a + 3b + s - 4)^2 without the constant term
+        self.assertEqual(q.dict[((0, 1, 0), (0, 1, 0))], 10 * (4 - 16))
+        self.assertEqual(q.dict[((0, 2, 0), (0, 2, 0))], 10 * (9 - 24))
+        self.assertEqual(q.dict[(('s', 0, 0), ('s', 0, 0))], 10 * (1 - 8))
+        self.assertEqual(q.dict[((0, 1, 0), (0, 2, 0))], 10 * 12)
+        self.assertEqual(q.dict[(('s', 0, 0), (0, 1, 0))], 10 * 4)
+        self.assertEqual(q.dict[(('s', 0, 0), (0, 2, 0))], 10 * 6)
+        self.assertEqual(len(q.dict), 6)
+
+    def test_add_all_pairs_matches_add(self):
+        for variables in ([(1, 2, 0), (0, 3, 1), (0, 1, 0)], [(0, 1, 0), ('s', 0, 1), 'x']):
+            expected = Qubo()
+            for a in range(len(variables)):
+                for b in range(a + 1, len(variables)):
+                    expected.add((variables[a], variables[b]), 3)
+            q = Qubo()
+            q.add_all_pairs(variables, 3)
+            self.assertEqual(q.dict, expected.dict)
+
 
 class TestVRPProblem(unittest.TestCase):
     def setUp(self):
@@ -79,6 +110,17 @@ class TestVRPProblem(unittest.TestCase):
         self.assertTrue(len(qubo.dict) > 0)
         self.assertIn(((0, 1, 0), (0, 1, 0)), qubo.dict)
 
+    def test_get_bqm_converts_each_qubo_once(self):
+        qubo = self.problem.get_qubo([2, 2], 1000, 1, 100, 100, 50)
+        bqm = self.problem.get_bqm(qubo)
+        self.assertIs(self.problem.get_bqm(qubo), bqm)
+
+        sample = {var: 0 for var in bqm.variables}
+        sample[(0, 1, 0)] = 1
+        sample[(1, 2, 0)] = 1
+        expected = sum(bias for (u, v), bias in qubo.dict.items() if sample[u] and sample[v])
+        self.assertAlmostEqual(bqm.energy(sample), expected)
+
 
 class TestVRPSolution(unittest.TestCase):
     def setUp(self):
@@ -1,7 +1,10 @@
+import itertools
+import logging
 import pytest
 from graph_coarsening.graph import Graph, compute_euclidean_tau
 from graph_coarsening.node import Node
-from graph_coarsening.utils import calculate_route_metrics
+from graph_coarsening.utils import calculate_route_metrics, log_tuning_summary
+from graph_coarsening.savings_solver import SavingsSolver
 
 @pytest.fixture
 def sample_graph():
@@ -301,3 +304,105 @@ def test_partial_customers_served(sample_graph):
     assert pytest.approx(metrics["total_demand_served"]) == 15.0
     assert metrics["is_feasible"] is True # The routes themselves are feasible, even if not all customers were served.
 
+
+def test_calculate_route_metrics_with_tau_table(sample_graph):
+    routes = [["D", "C1", "C2", "D"], ["D", "C3", "D"]]
+    depot_id = "D"
+    vehicle_capacity = 20
+
+    nodes = sample_graph.nodes
+    tau_table = {
+        id_a: {id_b: compute_euclidean_tau(node_a, node_b) for id_b, node_b in nodes.items()}
+        for id_a, node_a in nodes.items()
+    }
+
+    expected = calculate_route_metrics(sample_graph, routes, depot_id, vehicle_capacity)
+    metrics = calculate_route_metrics(sample_graph, routes, depot_id, vehicle_capacity, tau_table=tau_table)
+
+    assert metrics == expected
+
+
+def test_log_tuning_summary_emits_one_record(sample_graph, caplog):
+    metrics = calculate_route_metrics(sample_graph, [["D", "C1", "C2", "D"]], "D", 30)
+    best_params_per_file = {"c101.csv": {"params": {"alpha": 0.5}, "score": 12.345, "metrics": metrics}}
+    logger = logging.getLogger("test_log_tuning_summary")
+
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        log_tuning_summary(
+            best_params_per_file, logger, "SUMMARY",
+            metric_fields={"Feasible": "is_feasible", "Dist": "total_distance", "Vehicles": "num_vehicles"},
+        )
+    assert len(caplog.records) == 1
+    lines = caplog.records[0].getMessage().split("\n")
+    assert lines[2] == "SUMMARY"
+    assert lines[4:] == [
+        "File: c101.csv",
+        "  Best Params: {'alpha': 0.5}",
+        "  Best Score: 12.35",
+        f"  Metrics: Feasible={metrics['is_feasible']}, Dist={metrics['total_distance']:.2f}, Vehicles=1",
+        "-" * 80,
+    ]
+
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        log_tuning_summary(best_params_per_file, logger, "SUMMARY")
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert "    Num Vehicles: 1" in message
+    assert "Routes List" not in message
+
+
+def _build_graph(nodes):
+    graph = Graph()
+    for node_args in nodes:
+        graph.add_node(Node(*node_args))
+    return graph
+
+
+def test_savings_solver_retries_pair_after_merge():
+    # C1-C3 has the largest saving but fails the depot check on its own. Once
+    # C3-C4 is merged, C1 -> [C3, C4] fits, and must be taken before C1-C4
+    graph = _build_graph([
+        ("D", 0, 0, 0, 0, 40, 0),
+        ("C1", 10, -6, 1, 0, 40, 0),
+        ("C2", -10, 2, 2, 0, 40, 0),
+        ("C3", 7, -9, 5, 0, 40, 0),
+        ("C4", 2, -2, 2, 0, 40, 0),
+    ])
+    solver = SavingsSolver(graph, "D", 10)
+    assert not solver._check_merge_feasibility(["D", "C1", "D"], ["D", "C3", "D"])
+    assert solver._check_merge_feasibility(["D", "C1", "D"], ["D", "C3", "C4", "D"])
+
+    routes, metrics = solver.solve()
+
+    assert sorted(routes) == [["D", "C1", "C3", "C4", "D"], ["D", "C2", "D"]]
+    assert metrics["is_feasible"] is True
+
+
+def test_savings_solver_single_customer_route_stays_an_endpoint():
+    # C3 joins [C1, C2] as a single-customer route and is still the last
+    # customer afterwards, so C3-C4 can extend the route once more
+    graph = _build_graph([
+        ("D", 0, 0, 0, 0, 1000, 0),
+        ("C1", -9, -8, 0, 0, 1000, 1),
+        ("C2", -8, 1, 0, 0, 1000, 1),
+        ("C3", -5, -1, 0, 0, 1000, 1),
+        ("C4", -2, 9, 0, 0, 1000, 1),
+    ])
+    routes, _ = SavingsSolver(graph, "D", 100).solve()
+
+    assert routes == [["D", "C1", "C2", "C3", "C4", "D"]]
+
+
+def test_check_merge_feasibility_matches_merged_tail_state(sample_graph):
+    solver = SavingsSolver(sample_graph, "D", 30)
+    candidates = [["D", *customers, "D"] for size in (1, 2) for customers in itertools.permutations(["C1", "C2", "C3"], size)]
+
+    for route1, route2 in itertools.product(candidates, repeat=2):
+        if set(route1[1:-1]) & set(route2[1:-1]):
+            continue
+        merged_state = solver._merged_tail_state(solver._tail_state(route1), route2)
+        assert solver._check_merge_feasibility(route1, route2) == (merged_state is not None)
+        if merged_state is not None:
+            # Continuing route1's tail state ends where walking the merged route does
+            assert merged_state == solver._tail_state(route1[:-1] + route2[1:])
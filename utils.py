@@ -1,7 +1,7 @@
 import re
 import csv
-import io
 import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from .graph import Graph, compute_euclidean_tau
 from .node import Node
@@ -28,7 +28,7 @@ def parse_float(value: str) -> float:
 
 
 
-def calculate_route_metrics(graph: Graph, routes: list, depot_id: str, vehicle_capacity: float):
+def calculate_route_metrics(graph: Graph, routes: list, depot_id: str, vehicle_capacity: float, tau_table: dict = None):
     """
     Calculates various metrics for a list of routes on a specified graph.
     
@@ -37,6 +37,8 @@ def calculate_route_metrics(graph: Graph, routes: list, depot_id: str, vehicle_c
         routes (list): A list of lists of node IDs, where each inner list is a route.
         depot_id (str): The ID of the depot node.
         vehicle_capacity (float): The maximum capacity of a vehicle.
+        tau_table (dict, optional): Precomputed travel times, tau_table[u_id][v_id].
+            When omitted, each leg is computed with compute_euclidean_tau.
         
     Returns:
         dict: A dictionary containing aggregated calculated metrics.
@@ -65,6 +67,12 @@ def calculate_route_metrics(graph: Graph, routes: list, depot_id: str, vehicle_c
             "routes_list": routes
         }
 
+    # Bind hot lookups locally; this runs for every candidate insertion in the greedy solver
+    nodes = graph.nodes
+    tau = compute_euclidean_tau
+    depot_node = nodes[depot_id]
+    depot_start = depot_node.e
+
     for route in routes:
         if not route or len(route) < 2 or (len(route) == 2 and route[0] == depot_id and route[1] == depot_id):
             continue
@@ -72,22 +80,24 @@ def calculate_route_metrics(graph: Graph, routes: list, depot_id: str, vehicle_c
         num_vehicles += 1
 
         current_load = 0.0
-        current_time = graph.nodes[depot_id].e
-        
-        for i in range(len(route) - 1):
-            from_node_id = route[i]
-            to_node_id = route[i+1]
+        current_time = depot_start
 
-            from_node = graph.nodes[from_node_id]
-            to_node = graph.nodes[to_node_id]
+        from_node_id = route[0]
+        from_node = nodes[from_node_id]
+        for to_node_id in route[1:]:
+            to_node = nodes[to_node_id]
+            is_customer = to_node_id != depot_id
 
-            if to_node_id != depot_id:
+            if is_customer:
                 current_load += to_node.demand
                 if current_load > vehicle_capacity:
                     capacity_violations += 1
                     all_feasible = False
 
-            travel_time = compute_euclidean_tau(from_node, to_node)
+            if tau_table is None:
+                travel_time = tau(from_node, to_node)
+            else:
+                travel_time = tau_table[from_node_id][to_node_id]
             total_distance += travel_time
 
             arrival_time_at_to_node = current_time + travel_time
@@ -97,20 +107,22 @@ def calculate_route_metrics(graph: Graph, routes: list, depot_id: str, vehicle_c
                 time_window_violations += 1
                 all_feasible = False
 
-            waiting_time = max(0, to_node.e - arrival_time_at_to_node)
-            total_waiting_time += waiting_time
+            total_waiting_time += max(0, to_node.e - arrival_time_at_to_node)
 
             current_time = service_start_time_at_to_node + to_node.s
 
-            if to_node_id != depot_id:
+            if is_customer:
                 total_service_time += to_node.s
                 total_demand_served += to_node.demand
 
+            from_node_id = to_node_id
+            from_node = to_node
+
         if route[-1] == depot_id:
-            last_customer_node_id = route[-2] if len(route) > 1 else depot_id
-            last_customer_node = graph.nodes[last_customer_node_id]
-            depot_node = graph.nodes[depot_id]
-            travel_time_to_depot = compute_euclidean_tau(last_customer_node, depot_node)
+            if tau_table is None:
+                travel_time_to_depot = tau(nodes[route[-2]], depot_node)
+            else:
+                travel_time_to_depot = tau_table[route[-2]][depot_id]
             final_arrival_at_depot = current_time + travel_time_to_depot
 
             if final_arrival_at_depot > depot_node.l:
@@ -137,6 +149,99 @@ def calculate_route_metrics(graph: Graph, routes: list, depot_id: str, vehicle_c
     }
 
 
+def log_tuning_summary(best_params_per_file: dict, logger: logging.Logger, title: str = "FINAL SUMMARY OF TUNING RESULTS",
+                       metric_fields: dict = None):
+    """
+    Logs the best parameters, score and metrics found for each tuned file.
+
+    The summary is assembled up front and emitted as a single log record.
+
+    Args:
+        best_params_per_file (dict): Maps file name to a dict with 'params', 'score' and 'metrics'.
+        logger (logging.Logger): The logger to write the summary to.
+        title (str): Heading printed above the summary.
+        metric_fields (dict, optional): Maps a label to a metrics key. When given, only
+            these metrics are logged, on one "Metrics: Label=value, ..." line. Otherwise
+            every scalar metric is logged on its own line; lists such as 'routes_list'
+            are left out.
+    """
+    rule = "=" * 80
+    lines = ["", rule, title, rule]
+    for file_name, result in best_params_per_file.items():
+        lines.append(f"File: {file_name}")
+        lines.append(f"  Best Params: {result['params']}")
+        lines.append(f"  Best Score: {result['score']:.2f}")
+        metrics = result['metrics']
+        if metrics and metric_fields:
+            fields = []
+            for label, key in metric_fields.items():
+                value = metrics.get(key)
+                fields.append(f"{label}={value:.2f}" if isinstance(value, float) else f"{label}={value}")
+            lines.append(f"  Metrics: {', '.join(fields)}")
+        elif metrics:
+            lines.append("  Resulting Metrics (on Original Graph after Inflation):")
+            for key, value in metrics.items():
+                if isinstance(value, (list, tuple, dict)):
+                    continue
+                label = key.replace('_', ' ').title()
+                if isinstance(value, float):
+                    lines.append(f"    {label}: {value:.2f}")
+                else:
+                    lines.append(f"    {label}: {value}")
+        lines.append("-" * 80)
+    logger.info("\n".join(lines))
+
+
+# Per-worker state for run_tuning_trials: the evaluation function, the file's
+# shared arguments and a cache that lives as long as the worker's pool
+_tuning_worker_state = {}
+
+
+def _init_tuning_worker(evaluate, shared_args: tuple):
+    """Pool initializer: stores the file's data once per worker, with an empty cache."""
+    _tuning_worker_state['evaluate'] = evaluate
+    _tuning_worker_state['shared_args'] = shared_args
+    _tuning_worker_state['cache'] = {}
+
+
+def _run_tuning_trial(trial_args: tuple):
+    """Worker entry point: evaluates one parameter combination against the stored file data."""
+    evaluate = _tuning_worker_state['evaluate']
+    return evaluate(*_tuning_worker_state['shared_args'], *trial_args, _tuning_worker_state['cache'])
+
+
+def run_tuning_trials(evaluate, shared_args: tuple, trial_args: list, failed_result, max_workers: int = None) -> list:
+    """
+    Evaluates every parameter combination for one file in a process pool.
+
+    Each worker receives ``shared_args`` (e.g. the file's graph, depot id and
+    vehicle capacity) once through the pool initializer, so the file is parsed
+    only by the caller. Trials are run as ``evaluate(*shared_args, *args, cache)``,
+    where ``cache`` is a dict kept by the worker for the lifetime of the pool.
+
+    Args:
+        evaluate (callable): Module-level evaluation function.
+        shared_args (tuple): Leading arguments common to every trial.
+        trial_args (list): One tuple of per-trial arguments per trial.
+        failed_result: Result recorded for a trial that raises.
+        max_workers (int, optional): Number of worker processes.
+
+    Returns:
+        list: One result per entry of ``trial_args``, in the same order.
+    """
+    results = [failed_result] * len(trial_args)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_tuning_worker,
+                             initargs=(evaluate, shared_args)) as pool:
+        futures = {pool.submit(_run_tuning_trial, args): i for i, args in enumerate(trial_args)}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                results[i] = fut.result()
+            except Exception as e:
+                logger.error(f"Tuning trial {i} with arguments {trial_args[i]} failed: {e}")
+    return results
+
+
 """def load_graph_from_csv(file_path: str) -> tuple[Graph, str, float]:
     
     graph = Graph()
@@ -267,9 +372,8 @@ def load_graph_from_csv(file_path: str) -> tuple[Graph, str, float]:
     depot_id = None
     vehicle_capacity = 200.0  # Default fallback if parsing fails
 
-    solomon_headers = [
-        'CUST NO.', 'XCOORD.', 'YCOORD.', 'DEMAND', 'READY TIME', 'DUE DATE', 'SERVICE TIME'
-    ]
+    # Column order: CUST NO., XCOORD., YCOORD., DEMAND, READY TIME, DUE DATE, SERVICE TIME
+    num_columns = 7
 
     try:
         with open(file_path, mode='r', newline='') as f:
@@ -304,35 +408,25 @@ def load_graph_from_csv(file_path: str) -> tuple[Graph, str, float]:
                              vehicle_capacity = float(match.group())
 
             # --- 3. Parse Data ---
-            # Data starts immediately after the header line
+            # Data starts immediately after the header line. Rows are read
+            # positionally, so no per-row dict is built.
             data_lines = lines[header_index + 1:] 
-            data_io = io.StringIO("".join(data_lines))
-            
-            # We use the known fieldnames to ensure correct mapping
-            reader = csv.DictReader(data_io, fieldnames=solomon_headers, delimiter=',', skipinitialspace=True)
+            reader = csv.reader(data_lines, delimiter=',', skipinitialspace=True)
 
-            for i, row in enumerate(reader):
-                # Clean row data
-                cleaned_row = {}
-                for k, v in row.items():
-                    if k and v and k.strip() and v.strip():
-                        cleaned_row[k.strip()] = v.strip()
+            for row in reader:
+                fields = [v.strip() for v in row[:num_columns]]
 
-                if not cleaned_row: continue
+                # Skip blank rows and rows with missing columns
+                if len(fields) < num_columns or not all(fields): continue
 
                 try:
-                    # Parse using solomon_headers keys
-                    # (Your CSV might have headers, but we force our standard keys for access)
-                    # Note: DictReader with fieldnames maps the columns in order.
-                    # Since we skipped the header line, the first data line maps to these keys.
-                    
-                    node_id = cleaned_row[solomon_headers[0]] # CUST NO.
-                    x = parse_float(cleaned_row[solomon_headers[1]])
-                    y = parse_float(cleaned_row[solomon_headers[2]])
-                    demand = parse_float(cleaned_row[solomon_headers[3]])
-                    e = parse_float(cleaned_row[solomon_headers[4]])
-                    l = parse_float(cleaned_row[solomon_headers[5]])
-                    s = parse_float(cleaned_row[solomon_headers[6]])
+                    node_id = fields[0] # CUST NO.
+                    x = parse_float(fields[1])
+                    y = parse_float(fields[2])
+                    demand = parse_float(fields[3])
+                    e = parse_float(fields[4])
+                    l = parse_float(fields[5])
+                    s = parse_float(fields[6])
                     
                     node = Node(node_id, x, y, s, e, l, demand)
                     graph.add_node(node)
@@ -341,7 +435,7 @@ def load_graph_from_csv(file_path: str) -> tuple[Graph, str, float]:
                     if depot_id is None:
                         depot_id = node_id
                         
-                except (ValueError, KeyError) as e:
+                except ValueError:
                     # Skip lines that might be malformed or empty
                     continue
                 